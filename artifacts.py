@@ -0,0 +1,45 @@
+import os
+import traceback
+import unittest
+
+# a failing or erroring browser test dumps its SiteManager's recent driver commands,
+# one dom snapshot, the console log and the graph text to a directory named after the
+# test. passing tests write nothing
+ARTIFACTS = os.environ.get("SITE_ARTIFACTS", "artifacts")
+
+
+def result_class(directory=None, base=unittest.TextTestResult):
+    directory = directory or ARTIFACTS
+
+    class ArtifactResult(base):
+        def dump(self, test, err):
+            site_manager = getattr(test, "site_manager", None)
+            if site_manager is None:
+                return
+            name = test.id().split(".")[-1]
+            error = "".join(traceback.format_exception(*err))
+            # a dump that cannot be written must not hide the failure or stop the run
+            try:
+                path = site_manager.dump_failure(os.path.join(directory, name), error)
+            except Exception as e:
+                self.stream.writeln(f"\n{name}: no artifacts, {type(e).__name__}: {e}")
+                return
+            self.stream.writeln(f"\n{name}: artifacts in {path}")
+
+        def addFailure(self, test, err):
+            super().addFailure(test, err)
+            self.dump(test, err)
+
+        def addError(self, test, err):
+            super().addError(test, err)
+            self.dump(test, err)
+
+    return ArtifactResult
+
+
+# for unittest.main(testRunner=...), which keeps its own verbosity flags for a class
+def runner_class(directory=None):
+    class ArtifactRunner(unittest.TextTestRunner):
+        resultclass = result_class(directory)
+
+    return ArtifactRunner
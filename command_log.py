@@ -0,0 +1,49 @@
+import collections
+import time
+
+# the recent driver commands of a SiteManager, kept for failure dumps without
+# importing selenium
+
+
+# a string or repr cut to limit characters
+def brief(value, limit=300):
+    if isinstance(value, str):
+        return value[:limit] + ("..." if len(value) > limit else "")
+    text = repr(value)
+    return text[:limit] + ("..." if len(text) > limit else "")
+
+
+# wraps driver.execute and keeps the last size commands in memory as (seconds since
+# start, command, params, seconds taken, response value or exception). they are only
+# formatted when a failure is dumped
+class CommandLog:
+    def __init__(self, execute, size=100):
+        self.execute = execute
+        self.entries = collections.deque(maxlen=size)
+        self.start = time.perf_counter()
+
+    def __call__(self, command, params=None):
+        start = time.perf_counter()
+        try:
+            response = self.execute(command, params)
+        except Exception as e:
+            took = time.perf_counter() - start
+            self.entries.append((start - self.start, command, params, took, e))
+            raise
+        took = time.perf_counter() - start
+        value = response.get("value") if isinstance(response, dict) else response
+        self.entries.append((start - self.start, command, params, took, value))
+        return response
+
+    def dump(self):
+        rows = []
+        for at, command, params, took, result in list(self.entries):
+            row = {"at": round(at, 4), "command": command, "seconds": round(took, 4)}
+            if params:
+                row["params"] = brief(params)
+            if isinstance(result, Exception):
+                row["error"] = f"{type(result).__name__}: {brief(str(result))}"
+            else:
+                row["result"] = brief(result)
+            rows.append(row)
+        return rows
@@ -0,0 +1,60 @@
+import unittest
+from command_log import CommandLog, brief
+
+
+class DriverError(Exception):
+    pass
+
+
+def execute(command, params=None):
+    if command == "fail":
+        raise DriverError("no such element\nstacktrace")
+    return {"value": params and params.get("echo")}
+
+
+class BriefTests(unittest.TestCase):
+    def test_short_values_unchanged(self):
+        self.assertEqual(brief("abc"), "abc")
+        self.assertEqual(brief({"a": 1}), "{'a': 1}")
+
+    def test_truncation(self):
+        self.assertEqual(brief("x" * 10, 4), "xxxx...")
+        self.assertEqual(brief(list(range(100)), 6), "[0, 1,...")
+        self.assertEqual(len(brief("y" * 1000)), 303)
+
+
+class CommandLogTests(unittest.TestCase):
+    def test_passes_responses_through(self):
+        log = CommandLog(execute)
+        self.assertEqual(log("executeScript", {"echo": 5}), {"value": 5})
+
+    def test_ring_keeps_last_commands(self):
+        log = CommandLog(execute, size=3)
+        for i in range(5):
+            log("executeScript", {"echo": i})
+        rows = log.dump()
+        self.assertEqual([row["result"] for row in rows], ["2", "3", "4"])
+        self.assertEqual(len(log.entries), 3)
+        ats = [row["at"] for row in rows]
+        self.assertEqual(ats, sorted(ats))
+
+    def test_exception_entry(self):
+        log = CommandLog(execute)
+        with self.assertRaises(DriverError):
+            log("fail", {"using": "id"})
+        (row,) = log.dump()
+        self.assertEqual(row["command"], "fail")
+        self.assertEqual(row["error"], "DriverError: no such element\nstacktrace")
+        self.assertNotIn("result", row)
+        self.assertEqual(row["params"], "{'using': 'id'}")
+
+    def test_long_results_truncated(self):
+        log = CommandLog(lambda command, params: {"value": "z" * 1000})
+        log("getPageSource")
+        (row,) = log.dump()
+        self.assertEqual(row["result"], "z" * 300 + "...")
+        self.assertNotIn("params", row)
+
+
+if __name__ == "__main__":
+    unittest.main()
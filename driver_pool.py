@@ -0,0 +1,311 @@
+import argparse
+import collections
+import http.client
+import json
+import shutil
+import socket
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils import poll
+
+# a local WebDriver endpoint in front of one long-lived chromedriver. new session
+# requests get a browser from a pool of ready ones, deleting a session hands the
+# browser back, and every other command is forwarded over a kept-alive connection.
+# pooled browsers are all started with the pool's capabilities, whatever a client asks
+
+# run on a session before it goes back to the pool
+RESET_JS = """
+try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+"""
+
+
+class PoolError(Exception):
+    pass
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class DriverPool:
+    def __init__(
+        self, chromedriver=None, size=2, port=4444, headless=False, check_every=30
+    ):
+        chromedriver = chromedriver or shutil.which("chromedriver")
+        if not chromedriver:
+            raise PoolError("chromedriver not found, pass its path")
+        self.driver_port = _free_port()
+        self.process = subprocess.Popen(
+            [chromedriver, f"--port={self.driver_port}"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        args = ["--headless=new"] if headless else []
+        self.capabilities = {
+            "capabilities": {
+                "alwaysMatch": {
+                    "browserName": "chrome",
+                    "goog:chromeOptions": {"args": args},
+                    "goog:loggingPrefs": {"browser": "ALL"},
+                }
+            }
+        }
+        self.size = size
+        self.check_every = check_every
+        self.lock = threading.Lock()
+        # ready session ids, and the new session response each was created with
+        self.idle = collections.deque()
+        self.created = {}
+        self.leased = set()
+        self.stats = collections.Counter()
+        self.local = threading.local()
+        self.stopping = threading.Event()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.threads = [
+            threading.Thread(target=self.server.serve_forever, daemon=True),
+            threading.Thread(target=self._check_loop, daemon=True),
+        ]
+
+    # one kept-alive connection to chromedriver per thread
+    def request(self, method, path, body=None):
+        for attempt in range(2):
+            conn = getattr(self.local, "conn", None)
+            if conn is None:
+                conn = self.local.conn = http.client.HTTPConnection(
+                    "127.0.0.1", self.driver_port, timeout=60
+                )
+            headers = {"Content-Type": "application/json; charset=utf-8"}
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise
+
+    def _command(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode()
+        status, data = self.request(method, path, body)
+        return status, json.loads(data or b"null")
+
+    def _create(self):
+        status, data = self.request(
+            "POST", "/session", json.dumps(self.capabilities).encode()
+        )
+        if status != 200:
+            raise PoolError(f"chromedriver refused a session: {data[:200]!r}")
+        session_id = json.loads(data)["value"]["sessionId"]
+        with self.lock:
+            self.created[session_id] = data
+            self.stats["created"] += 1
+        return session_id
+
+    def _quit(self, session_id):
+        try:
+            self.request("DELETE", f"/session/{session_id}")
+        except (http.client.HTTPException, OSError):
+            pass
+        with self.lock:
+            self.created.pop(session_id, None)
+
+    # a usable session has exactly the one window it was created with
+    def healthy(self, session_id):
+        try:
+            status, data = self._command("GET", f"/session/{session_id}/window/handles")
+        except (http.client.HTTPException, OSError, ValueError):
+            return False
+        return status == 200 and len(data["value"]) == 1
+
+    def _evict(self, session_id):
+        with self.lock:
+            self.stats["evicted"] += 1
+        self._quit(session_id)
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                session_id = self.idle.popleft() if self.idle else None
+            if session_id is None:
+                session_id = self._create()
+                break
+            if self.healthy(session_id):
+                break
+            self._evict(session_id)
+        with self.lock:
+            self.stats["handed out"] += 1
+            self.leased.add(session_id)
+            return session_id, self.created[session_id]
+
+    # clears what a test leaves behind: devtools blocking, storage, cookies, the console
+    # log and the page
+    def release(self, session_id):
+        with self.lock:
+            self.leased.discard(session_id)
+        path = f"/session/{session_id}"
+        try:
+            self._command(
+                "POST",
+                f"{path}/goog/cdp/execute",
+                {"cmd": "Network.setBlockedURLs", "params": {"urls": []}},
+            )
+            script = {"script": RESET_JS, "args": []}
+            self._command("POST", f"{path}/execute/sync", script)
+            self._command("DELETE", f"{path}/cookie")
+            self._command("POST", f"{path}/se/log", {"type": "browser"})
+            self._command("POST", f"{path}/url", {"url": "about:blank"})
+        except (http.client.HTTPException, OSError, ValueError):
+            pass
+        if not self.healthy(session_id):
+            self._evict(session_id)
+            return
+        with self.lock:
+            if len(self.idle) < self.size:
+                self.idle.append(session_id)
+                return
+        self._quit(session_id)
+
+    def fill(self):
+        while True:
+            with self.lock:
+                if len(self.idle) >= self.size:
+                    return
+            session_id = self._create()
+            with self.lock:
+                self.idle.append(session_id)
+
+    # idle sessions are taken out of the pool while they are checked
+    def check(self):
+        with self.lock:
+            pending = list(self.idle)
+            self.idle.clear()
+        for session_id in pending:
+            if self.healthy(session_id):
+                with self.lock:
+                    self.idle.append(session_id)
+            else:
+                self._evict(session_id)
+        self.fill()
+
+    def _check_loop(self):
+        while not self.stopping.wait(self.check_every):
+            try:
+                self.check()
+            except PoolError:
+                pass
+
+    def start(self):
+        def ready():
+            try:
+                status, data = self._command("GET", "/status")
+            except (OSError, http.client.HTTPException):
+                return False
+            return status == 200 and data["value"]["ready"]
+
+        if not poll(ready, 10):
+            self.process.terminate()
+            raise PoolError("chromedriver did not start")
+        self.fill()
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self.stopping.set()
+        self.server.shutdown()
+        self.server.server_close()
+        with self.lock:
+            sessions = list(self.created)
+        for session_id in sessions:
+            self._quit(session_id)
+        self.process.terminate()
+        self.process.wait()
+
+    def status(self):
+        with self.lock:
+            return {
+                "idle": len(self.idle),
+                "leased": len(self.leased),
+                **self.stats,
+            }
+
+    def _handler(self):
+        pool = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # keep-alive towards the clients too
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, data):
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                parts = self.path.rstrip("/").split("/")
+                is_session = len(parts) == 3 and parts[1] == "session"
+                try:
+                    if method == "POST" and parts == ["", "session"]:
+                        _, data = pool.acquire()
+                        self._reply(200, data)
+                    elif method == "DELETE" and is_session:
+                        pool.release(parts[2])
+                        self._reply(200, b'{"value": null}')
+                    elif method == "GET" and self.path == "/pool":
+                        self._reply(200, json.dumps(pool.status()).encode())
+                    else:
+                        self._reply(*pool.request(method, self.path, body))
+                except (PoolError, http.client.HTTPException, OSError) as e:
+                    error = {"error": "unknown error", "message": str(e)}
+                    self._reply(500, json.dumps({"value": error}).encode())
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+            def do_DELETE(self):
+                self._handle("DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="serve a pool of ready browser sessions as a WebDriver endpoint"
+    )
+    parser.add_argument("--chromedriver", help="path, default from PATH")
+    parser.add_argument("--size", type=int, default=2, help="idle sessions to keep")
+    parser.add_argument("--port", type=int, default=4444)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument(
+        "--check-every", type=float, default=30, help="health check period, seconds"
+    )
+    args = parser.parse_args()
+
+    pool = DriverPool(
+        args.chromedriver, args.size, args.port, args.headless, args.check_every
+    ).start()
+    print(f"serving {args.size} sessions at {pool.url}")
+    try:
+        pool.threads[0].join()
+    except KeyboardInterrupt:
+        print(pool.status())
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import collections
+import re
+
+# value is the net flow into t, cut the source side of a minimum cut when the flow is
+# maximum, problems one line per violated condition
+FlowReport = collections.namedtuple("FlowReport", ["value", "cut", "problems"])
+
+
+# an edge label as the site draws it after a run, "flow/capacity"
+FLOW_LABEL = re.compile(r"^\s*(-?\d+)\s*/\s*(-?\d+)\s*$")
+# the label's (or its group's) element id names its edge either by index, a name
+# ending in one number like "edge3", or by endpoints like "e0_1". which one the site
+# uses is not confirmed yet, see flow_check_tests.RecordedRunTests
+EDGE_INDEX = re.compile(r"^[A-Za-z-]*(\d+)$")
+EDGE_ENDPOINTS = re.compile(r"^[A-Za-z-]*(\d+)_(\d+)$")
+
+
+class FlowLabelError(ValueError):
+    pass
+
+
+def _edge_key(element_id):
+    index = EDGE_INDEX.match(element_id or "")
+    if index:
+        return int(index.group(1))
+    ends = EDGE_ENDPOINTS.match(element_id or "")
+    if ends:
+        return int(ends.group(1)), int(ends.group(2))
+    return None
+
+
+# texts are (element id, text) for every svg text element; returns (key, flow,
+# capacity) for the ones that are flow labels, key being the edge index, the edge's
+# (u, v) or None when the id names neither
+def parse_flow_labels(texts):
+    labels = []
+    for element_id, text in texts:
+        label = FLOW_LABEL.match(text or "")
+        if not label:
+            continue
+        key = _edge_key(element_id)
+        labels.append((key, int(label.group(1)), int(label.group(2))))
+    return labels
+
+
+# labels keyed by (u, v) in the order of edges; parallel edges take their labels in
+# page order
+def _by_endpoints(edges, labels):
+    pending = collections.defaultdict(collections.deque)
+    for label in labels:
+        pending[label[0]].append(label)
+    ordered = []
+    for i, (u, v, _) in enumerate(edges):
+        if not pending[u, v]:
+            raise FlowLabelError(f"no flow label for edge {i} {u}->{v}")
+        ordered.append(pending[u, v].popleft())
+    return ordered
+
+
+# the flow on each of edges, read off labels in edge order. a page without labels
+# fails instead of passing as an empty flow
+def label_flows(edges, labels):
+    if not labels:
+        raise FlowLabelError("no flow labels found on the page")
+    if len(labels) != len(edges):
+        raise FlowLabelError(f"found {len(labels)} flow labels for {len(edges)} edges")
+    if all(isinstance(key, int) for key, _, _ in labels):
+        labels = sorted(labels, key=lambda label: label[0])
+    elif all(isinstance(key, tuple) for key, _, _ in labels):
+        labels = _by_endpoints(edges, labels)
+    flows = []
+    for i, ((u, v, c), (_, flow, cap)) in enumerate(zip(edges, labels)):
+        if cap != c:
+            raise FlowLabelError(f"label {flow}/{cap} does not match edge {i} {u}->{v}")
+        flows.append(flow)
+    return flows
+
+
+# checks capacities, conservation and maximality of flows[i] on edges[i] = (u, v, c)
+# in O(V + E). a flow is maximum iff t is unreachable from s in the residual graph,
+# and then the reachable side is a min cut that every flow edge leaving it saturates
+def check_flow(n, edges, flows, s, t, value=None):
+    problems = []
+    if len(flows) != len(edges):
+        problems.append(f"{len(flows)} flows for {len(edges)} edges")
+        return FlowReport(None, None, problems)
+    excess = [0] * n
+    residual = [[] for _ in range(n)]
+    for i, ((u, v, c), f) in enumerate(zip(edges, flows)):
+        if not 0 <= f <= c:
+            problems.append(f"edge {i} ({u}->{v}) carries {f} of capacity {c}")
+        excess[u] -= f
+        excess[v] += f
+        if f < c:
+            residual[u].append(v)
+        if f > 0:
+            residual[v].append(u)
+    for x in range(n):
+        if x != s and x != t and excess[x] != 0:
+            problems.append(f"flow is not conserved at vertex {x} (excess {excess[x]})")
+    total = excess[t]
+    if value is not None and total != value:
+        problems.append(f"edge flows add up to {total}, not {value}")
+
+    seen = [False] * n
+    seen[s] = True
+    queue = collections.deque([s])
+    while queue:
+        for v in residual[queue.popleft()]:
+            if not seen[v]:
+                seen[v] = True
+                queue.append(v)
+    if seen[t]:
+        problems.append(f"flow {total} is not maximum, t is reachable in the residual")
+        return FlowReport(total, None, problems)
+    cut = [x for x in range(n) if seen[x]]
+    capacity = sum(c for u, v, c in edges if seen[u] and not seen[v])
+    if capacity != total:
+        problems.append(f"min cut capacity {capacity} differs from flow {total}")
+    return FlowReport(total, cut, problems)
@@ -0,0 +1,164 @@
+import os
+import unittest
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+import graph_validator
+from flow_check import FlowLabelError, check_flow, label_flows, parse_flow_labels
+
+# the drawn graph after a run, in the layout the label parser expects: vertex
+# numbers and "flow/capacity" edge labels as svg text, the edge index at the end of
+# the label's or its group's id. hand-written, not captured from the live site; a
+# page_archive recording of a finished run should replace it
+FINISHED_RUN_SVG = """
+<svg xmlns="http://www.w3.org/2000/svg">
+  <g id="vertex0"><circle r="16"/><text>0</text></g>
+  <g id="vertex1"><circle r="16"/><text>1</text></g>
+  <g id="vertex2"><circle r="16"/><text>2</text></g>
+  <g id="vertex3"><circle r="16"/><text>3</text></g>
+  <g id="edge2"><path d="M0 0"/><text> 2 / 3 </text></g>
+  <g id="edge0"><path d="M0 0"/><text>2/2</text></g>
+  <text id="edgelabel1">4/4</text>
+  <g id="edge3"><path d="M0 0"/><text>4/5</text></g>
+  <text id="status">Max flow is 6.</text>
+</svg>
+"""
+
+# 0 -> {1, 2} -> 3
+EDGES = [(0, 1, 2), (0, 2, 4), (1, 3, 3), (2, 3, 5)]
+
+
+# what FLOW_LABELS_JS returns: [id, text] per text element, the parent's id if it
+# has none
+def svg_texts(markup):
+    root = ET.fromstring(markup)
+    parents = {child: parent for parent in root.iter() for child in parent}
+    texts = []
+    for el in root.iter("{http://www.w3.org/2000/svg}text"):
+        element_id = el.get("id") or parents[el].get("id") or ""
+        texts.append([element_id, "".join(el.itertext())])
+    return texts
+
+
+class FlowLabelTests(unittest.TestCase):
+    def test_parse_fixture(self):
+        labels = parse_flow_labels(svg_texts(FINISHED_RUN_SVG))
+        self.assertEqual(labels, [(2, 2, 3), (0, 2, 2), (1, 4, 4), (3, 4, 5)])
+
+    def test_flows_in_edge_order(self):
+        labels = parse_flow_labels(svg_texts(FINISHED_RUN_SVG))
+        flows = label_flows(EDGES, labels)
+        self.assertEqual(flows, [2, 4, 2, 4])
+        self.assertEqual(check_flow(4, EDGES, flows, 0, 3, 6).problems, [])
+
+    def test_endpoint_ids(self):
+        texts = [["e2_3", "4/5"], ["e0_1", "2/2"], ["e1_3", "2/3"], ["e0_2", "4/4"]]
+        labels = parse_flow_labels(texts)
+        self.assertEqual(labels[1], ((0, 1), 2, 2))
+        self.assertEqual(label_flows(EDGES, labels), [2, 4, 2, 4])
+
+    def test_parallel_endpoint_ids_in_page_order(self):
+        edges = [(0, 1, 2), (0, 1, 3)]
+        labels = parse_flow_labels([["e0_1", "2/2"], ["e0_1", "1/3"]])
+        self.assertEqual(label_flows(edges, labels), [2, 1])
+
+    def test_missing_endpoint_label(self):
+        labels = parse_flow_labels([["e0_1", "2/2"], ["e0_3", "1/4"]])
+        with self.assertRaisesRegex(FlowLabelError, "no flow label for edge 1 0->2"):
+            label_flows(EDGES[:2], labels)
+
+    def test_page_order_without_ids(self):
+        labels = parse_flow_labels([["", "2/2"], [None, "1/4"]])
+        self.assertEqual(label_flows(EDGES[:2], labels), [2, 1])
+
+    def test_no_labels_fails(self):
+        texts = [["vertex0", "0"], ["status", "Max flow is 0."]]
+        with self.assertRaisesRegex(FlowLabelError, "no flow labels"):
+            label_flows([], parse_flow_labels(texts))
+        with self.assertRaisesRegex(FlowLabelError, "no flow labels"):
+            label_flows(EDGES, [])
+
+    def test_count_mismatch(self):
+        labels = parse_flow_labels(svg_texts(FINISHED_RUN_SVG))
+        with self.assertRaisesRegex(FlowLabelError, "found 4 flow labels for 3"):
+            label_flows(EDGES[:3], labels)
+
+    def test_capacity_mismatch(self):
+        edges = [(0, 1, 2), (0, 2, 4), (1, 3, 3), (2, 3, 6)]
+        labels = parse_flow_labels(svg_texts(FINISHED_RUN_SVG))
+        with self.assertRaisesRegex(FlowLabelError, "does not match edge 3"):
+            label_flows(edges, labels)
+
+
+# a finished run saved with site_manager.dump_failure(RECORDED_RUN) right after
+# run_algorithm from 0 to n - 1, for checking the parser against the real page
+RECORDED_RUN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flow_run")
+
+
+# svg_texts for a dom.html snapshot, which is html rather than xml
+class _SvgTexts(HTMLParser):
+    # html elements without an end tag
+    VOID = {"area", "base", "br", "col", "hr", "img", "input", "link", "meta", "wbr"}
+
+    def __init__(self):
+        super().__init__()
+        self.ids = []
+        self.texts = []
+        self.current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID:
+            return
+        element_id = dict(attrs).get("id") or ""
+        if tag == "text":
+            self.current = [element_id or (self.ids[-1] if self.ids else ""), ""]
+        self.ids.append(element_id)
+
+    def handle_endtag(self, tag):
+        if self.ids and tag not in self.VOID:
+            self.ids.pop()
+        if tag == "text" and self.current is not None:
+            self.texts.append(self.current)
+            self.current = None
+
+    def handle_data(self, data):
+        if self.current is not None:
+            self.current[1] += data
+
+
+@unittest.skipUnless(os.path.isdir(RECORDED_RUN), "no recorded run in flow_run/")
+class RecordedRunTests(unittest.TestCase):
+    def test_labels_match_graph(self):
+        with open(os.path.join(RECORDED_RUN, "graph.txt"), encoding="utf-8") as f:
+            n, edges = graph_validator.parse(f.read())
+        parser = _SvgTexts()
+        with open(os.path.join(RECORDED_RUN, "dom.html"), encoding="utf-8") as f:
+            parser.feed(f.read())
+        labels = parse_flow_labels(parser.texts)
+        flows = label_flows(edges, labels)
+        self.assertEqual(check_flow(n, edges, flows, 0, n - 1).problems, [])
+
+
+class CheckFlowTests(unittest.TestCase):
+    def test_not_maximum(self):
+        report = check_flow(4, EDGES, [1, 1, 1, 1], 0, 3)
+        self.assertEqual(report.value, 2)
+        self.assertIn("not maximum", report.problems[0])
+
+    def test_over_capacity_and_conservation(self):
+        problems = check_flow(4, EDGES, [3, 1, 2, 1], 0, 3).problems
+        self.assertTrue(any("carries 3 of capacity 2" in p for p in problems))
+        self.assertTrue(any("not conserved at vertex 1" in p for p in problems))
+
+    def test_min_cut(self):
+        report = check_flow(4, EDGES, [2, 4, 2, 4], 0, 3)
+        self.assertEqual(report.problems, [])
+        self.assertEqual(report.value, 6)
+        self.assertEqual(report.cut, [0])
+
+    def test_value_mismatch(self):
+        problems = check_flow(4, EDGES, [2, 4, 2, 4], 0, 3, 5).problems
+        self.assertEqual(problems, ["edge flows add up to 6, not 5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import graph_format
+import graph_hash
+
+
+class Graph:
+    def __init__(self, n):
+        self.n = n
+        self.edges = []
+
+    def add_edge(self, u, v, w):
+        # graphs loaded from the binary format share their columns read-only
+        if not isinstance(self.edges, list):
+            self.edges = list(self.edges)
+        self.edges.append((u, v, w))
+
+    def __str__(self):
+        s = f"{self.n} {len(self.edges)}\n"
+        for u, v, w in self.edges:
+            s += f"{u} {v} {w}\n"
+        return s
+
+    # sorted edges with parallel ones merged, which keeps every max flow the same
+    def canonical(self):
+        return self._from_columns(self.n, graph_hash.canonical_edges(self.edges))
+
+    def fingerprint(self):
+        return graph_hash.fingerprint(self.n, self.edges)
+
+    # also the same for relabelled copies that keep s and t (default 0 and n - 1)
+    def wl_hash(self, s=0, t=None, rounds=3):
+        return graph_hash.wl_hash(self.n, self.edges, s, t, rounds)
+
+    @classmethod
+    def _from_columns(cls, n, edges):
+        graph = cls(n)
+        graph.edges = edges
+        return graph
+
+    def to_bytes(self, checksum=True):
+        return graph_format.pack(self.n, self.edges, checksum)
+
+    def save(self, path, checksum=True):
+        data = self.to_bytes(checksum)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    # zero-copy: the edges are memoryviews into buf, which must outlive the graph
+    @classmethod
+    def from_buffer(cls, buf, verify=True):
+        n, edges, _ = graph_format.unpack(buf, verify)
+        return cls._from_columns(n, edges)
+
+    @classmethod
+    def load(cls, path, verify=True):
+        return cls.from_buffer(graph_format.map_file(path), verify)
+
+    @classmethod
+    def open_corpus(cls, path, verify=False):
+        return graph_format.Corpus(path, verify, cls._from_columns)
+
+    # dedup, a graph_hash.Dedup, leaves out graphs it has already seen
+    @staticmethod
+    def write_corpus(path, graphs, checksum=True, dedup=None):
+        with graph_format.CorpusWriter(path, checksum, dedup) as writer:
+            for graph in graphs:
+                writer.add(graph.n, graph.edges)
@@ -0,0 +1,197 @@
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+
+# binary graph layout (little-endian):
+#   header: magic, version, flags, n, m, crc32 of the column bytes
+#   u column: int32[m], v column: int32[m], padding to 8 bytes, w column: int64[m]
+MAGIC = b"MFGB"
+VERSION = 1
+FLAG_CHECKSUM = 1
+HEADER = struct.Struct("<4sHHIQI")
+
+INDEX_MAGIC = b"MFGI"
+INDEX_HEADER = struct.Struct("<4sHHQ")
+
+NATIVE_LITTLE = sys.byteorder == "little"
+
+
+class GraphFormatError(ValueError):
+    pass
+
+
+def _pad(size):
+    return -size % 8
+
+
+def _layout(m):
+    u_off = HEADER.size
+    v_off = u_off + 4 * m
+    w_off = v_off + 4 * m + _pad(v_off + 4 * m)
+    return u_off, v_off, w_off, w_off + 8 * m
+
+
+# read-only view of the three edge columns, indexable like the usual list of (u, v, w)
+class EdgeColumns(Sequence):
+    def __init__(self, u, v, w):
+        self.u = u
+        self.v = v
+        self.w = w
+
+    def __len__(self):
+        return len(self.u)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return self.u[i], self.v[i], self.w[i]
+
+    def __iter__(self):
+        return zip(self.u, self.v, self.w)
+
+
+def _columns(edges):
+    if isinstance(edges, EdgeColumns):
+        return array("i", edges.u), array("i", edges.v), array("q", edges.w)
+    try:
+        u = array("i", [e[0] for e in edges])
+        v = array("i", [e[1] for e in edges])
+        w = array("q", [e[2] for e in edges])
+    except (TypeError, OverflowError) as e:
+        raise GraphFormatError(
+            f"binary format needs int32 endpoints and int64 capacities: {e}"
+        )
+    return u, v, w
+
+
+def pack(n, edges, checksum=True):
+    m = len(edges)
+    u, v, w = _columns(edges)
+    if not NATIVE_LITTLE:
+        for col in (u, v, w):
+            col.byteswap()
+    _, v_off, w_off, _ = _layout(m)
+    body = [u.tobytes(), v.tobytes(), bytes(w_off - v_off - 4 * m), w.tobytes()]
+    crc = 0
+    if checksum:
+        for chunk in body:
+            crc = zlib.crc32(chunk, crc)
+    header = HEADER.pack(MAGIC, VERSION, FLAG_CHECKSUM if checksum else 0, n, m, crc)
+    return b"".join([header] + body)
+
+
+def _cast(view, fmt):
+    if NATIVE_LITTLE:
+        return view.cast(fmt)
+    # no zero-copy on big-endian hosts, fall back to a swapped copy
+    col = array(fmt, view.tobytes())
+    col.byteswap()
+    return col
+
+
+# returns (n, edges, record size) without copying the column data out of buf
+def unpack(buf, verify=True, offset=0):
+    view = memoryview(buf)
+    if len(view) - offset < HEADER.size:
+        raise GraphFormatError("truncated graph header")
+    magic, version, flags, n, m, crc = HEADER.unpack_from(view, offset)
+    if magic != MAGIC:
+        raise GraphFormatError("not a binary graph (bad magic)")
+    if version != VERSION:
+        raise GraphFormatError(f"unsupported graph format version {version}")
+    u_off, v_off, w_off, end = (offset + x for x in _layout(m))
+    if len(view) < end:
+        raise GraphFormatError("truncated graph data")
+    if verify and flags & FLAG_CHECKSUM:
+        if zlib.crc32(view[u_off:end]) != crc:
+            raise GraphFormatError("graph checksum mismatch")
+    edges = EdgeColumns(
+        _cast(view[u_off:v_off], "i"),
+        _cast(view[v_off : v_off + 4 * m], "i"),
+        _cast(view[w_off:end], "q"),
+    )
+    return n, edges, end - offset
+
+
+# empty files cannot be mapped and read as no bytes, which unpack reports as truncated
+def map_file(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+# a corpus is one data file of back-to-back graph records plus an index of their offsets
+def index_path(path):
+    return path + ".idx"
+
+
+class CorpusWriter:
+    # with dedup, a graph_hash.Dedup, add skips graphs already written and returns None
+    def __init__(self, path, checksum=True, dedup=None):
+        self.path = path
+        self.checksum = checksum
+        self.dedup = dedup
+        self.offsets = array("Q", [0])
+        self.data = open(path, "wb")
+
+    def add(self, n, edges):
+        if self.dedup is not None and not self.dedup.add(n, edges):
+            return None
+        record = pack(n, edges, self.checksum)
+        self.data.write(record)
+        self.offsets.append(self.offsets[-1] + len(record))
+        return len(self.offsets) - 2
+
+    def close(self):
+        self.data.close()
+        offsets = self.offsets
+        if not NATIVE_LITTLE:
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        header = INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0, len(self.offsets) - 1)
+        with open(index_path(self.path), "wb") as f:
+            f.write(header + offsets.tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Corpus(Sequence):
+    def __init__(self, path, verify=False, factory=None):
+        self.path = path
+        self.verify = verify
+        self.factory = factory
+        self.data = map_file(path)
+        index = map_file(index_path(path))
+        if len(index) < INDEX_HEADER.size:
+            raise GraphFormatError(f"truncated corpus index for {path}")
+        magic, version, _, count = INDEX_HEADER.unpack_from(index)
+        if magic != INDEX_MAGIC or version != VERSION:
+            raise GraphFormatError(f"bad corpus index for {path}")
+        if len(index) < INDEX_HEADER.size + 8 * (count + 1):
+            raise GraphFormatError(f"truncated corpus index for {path}")
+        self.offsets = _cast(memoryview(index)[INDEX_HEADER.size :], "Q")
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("corpus index out of range")
+        n, edges, _ = unpack(self.data, self.verify, self.offsets[i])
+        if self.factory is not None:
+            return self.factory(n, edges)
+        return n, edges
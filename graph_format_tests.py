@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+from graph import Graph
+from graph_format import GraphFormatError, HEADER, index_path, pack, unpack
+
+EDGES = [(0, 1, 5), (1, 2, 3), (0, 2, 2**40)]
+
+
+class PackTests(unittest.TestCase):
+    def test_round_trip(self):
+        for checksum in (True, False):
+            data = pack(3, EDGES, checksum)
+            n, edges, size = unpack(data)
+            self.assertEqual((n, list(edges), size), (3, EDGES, len(data)))
+
+    def test_offset_and_no_edges(self):
+        data = pack(2, []) + pack(3, EDGES)
+        n, edges, size = unpack(data)
+        self.assertEqual((n, list(edges)), (2, []))
+        n, edges, _ = unpack(data, offset=size)
+        self.assertEqual((n, list(edges)), (3, EDGES))
+
+    def test_checksum_corruption(self):
+        data = bytearray(pack(3, EDGES))
+        data[HEADER.size] ^= 1
+        with self.assertRaisesRegex(GraphFormatError, "checksum"):
+            unpack(data)
+        # without verification the corrupt column is read as it is
+        self.assertEqual(unpack(data, verify=False)[1][0], (1, 1, 5))
+
+    def test_unchecked_records_skip_verification(self):
+        data = bytearray(pack(3, EDGES, checksum=False))
+        data[HEADER.size] ^= 1
+        self.assertEqual(unpack(data)[1][0], (1, 1, 5))
+
+    def test_bad_header(self):
+        with self.assertRaisesRegex(GraphFormatError, "truncated graph header"):
+            unpack(b"")
+        with self.assertRaisesRegex(GraphFormatError, "bad magic"):
+            unpack(b"XXXX" + pack(3, EDGES)[4:])
+        with self.assertRaisesRegex(GraphFormatError, "truncated graph data"):
+            unpack(pack(3, EDGES)[:-1])
+
+    def test_values_out_of_range(self):
+        with self.assertRaises(GraphFormatError):
+            pack(2, [(0, 1, "5")])
+        with self.assertRaises(GraphFormatError):
+            pack(2, [(0, 2**31, 5)])
+
+
+class FileTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "graphs.bin")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def graph(self, n=3, edges=EDGES):
+        graph = Graph(n)
+        for edge in edges:
+            graph.add_edge(*edge)
+        return graph
+
+    def test_save_and_load(self):
+        self.graph().save(self.path)
+        loaded = Graph.load(self.path)
+        self.assertEqual(str(loaded), str(self.graph()))
+        # loaded edges are read-only columns until an edge is added
+        loaded.add_edge(2, 0, 1)
+        self.assertEqual(loaded.edges[-1], (2, 0, 1))
+
+    def test_corpus_round_trip(self):
+        graphs = [self.graph(), self.graph(2, [(0, 1, 7)]), self.graph(1, [])]
+        Graph.write_corpus(self.path, graphs)
+        corpus = Graph.open_corpus(self.path, verify=True)
+        self.assertEqual([str(g) for g in corpus], [str(g) for g in graphs])
+        self.assertEqual(str(corpus[-1]), str(graphs[-1]))
+        with self.assertRaises(IndexError):
+            corpus[3]
+
+    def test_corpus_checksum_corruption(self):
+        Graph.write_corpus(self.path, [self.graph()])
+        with open(self.path, "r+b") as f:
+            f.seek(HEADER.size)
+            f.write(b"\xff")
+        with self.assertRaisesRegex(GraphFormatError, "checksum"):
+            Graph.open_corpus(self.path, verify=True)[0]
+
+    def test_empty_graph_file(self):
+        open(self.path, "wb").close()
+        with self.assertRaisesRegex(GraphFormatError, "truncated graph header"):
+            Graph.load(self.path)
+
+    def test_empty_corpus(self):
+        Graph.write_corpus(self.path, [])
+        self.assertEqual(os.path.getsize(self.path), 0)
+        self.assertEqual(len(Graph.open_corpus(self.path)), 0)
+
+    def test_empty_corpus_index(self):
+        Graph.write_corpus(self.path, [self.graph()])
+        open(index_path(self.path), "wb").close()
+        with self.assertRaisesRegex(GraphFormatError, "truncated corpus index"):
+            Graph.open_corpus(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
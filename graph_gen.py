@@ -0,0 +1,86 @@
+import math
+import random
+from graph import Graph
+
+# graph families used by the benchmarking tools. every family puts the source at 0 and
+# the sink at n - 1 and makes sure the sink is reachable from the source
+
+
+def _cap(rng, max_cap):
+    return rng.randint(1, max_cap)
+
+
+def path(n, rng, max_cap=100):
+    graph = Graph(n)
+    for u in range(n - 1):
+        graph.add_edge(u, u + 1, _cap(rng, max_cap))
+    return graph
+
+
+# source -> layer 1 -> ... -> layer k -> sink, complete bipartite between layers
+def layered(n, rng, max_cap=100):
+    graph = Graph(n)
+    inner = list(range(1, n - 1))
+    width = max(1, math.isqrt(len(inner)))
+    layers = [[0]] + [inner[i : i + width] for i in range(0, len(inner), width)]
+    layers.append([n - 1])
+    for a, b in zip(layers, layers[1:]):
+        for u in a:
+            for v in b:
+                graph.add_edge(u, v, _cap(rng, max_cap))
+    return graph
+
+
+# every forward pair u -> v with u < v
+def complete(n, rng, max_cap=100):
+    graph = Graph(n)
+    for u in range(n):
+        for v in range(u + 1, n):
+            graph.add_edge(u, v, _cap(rng, max_cap))
+    return graph
+
+
+# side x side grid with right and down edges, source top-left and sink bottom-right
+def grid(n, rng, max_cap=100):
+    side = max(2, math.isqrt(n))
+    graph = Graph(side * side)
+    for r in range(side):
+        for c in range(side):
+            u = r * side + c
+            if c + 1 < side:
+                graph.add_edge(u, u + 1, _cap(rng, max_cap))
+            if r + 1 < side:
+                graph.add_edge(u, u + side, _cap(rng, max_cap))
+    return graph
+
+
+# a source-sink path plus degree * n random edges
+def sparse(n, rng, max_cap=100, degree=3):
+    graph = path(n, rng, max_cap)
+    for _ in range(degree * n):
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            graph.add_edge(u, v, _cap(rng, max_cap))
+    return graph
+
+
+# the same graph with every edge also added backwards, so max flows are symmetric
+def symmetrize(graph):
+    both = Graph(graph.n)
+    for u, v, w in graph.edges:
+        both.add_edge(u, v, w)
+        both.add_edge(v, u, w)
+    return both
+
+
+FAMILIES = {
+    "path": path,
+    "layered": layered,
+    "complete": complete,
+    "grid": grid,
+    "sparse": sparse,
+}
+
+
+def generate(family, n, seed=0, max_cap=100):
+    return FAMILIES[family](n, random.Random(seed), max_cap)
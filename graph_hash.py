@@ -0,0 +1,98 @@
+import hashlib
+
+# canonical form: edges sorted, parallel edges merged by adding their capacities. two
+# graphs with the same canonical form have the same max flow between any two vertices.
+# the Weisfeiler-Lehman hash also ignores vertex labels, except that the source and
+# sink keep theirs, so relabelled copies of a graph share it
+
+
+def _sort_key(edge):
+    return tuple((0, x, "") if isinstance(x, int) else (1, 0, str(x)) for x in edge)
+
+
+# malformed graphs keep edges with non-integer parts as they are
+def canonical_edges(edges):
+    merged = {}
+    other = []
+    for u, v, c in edges:
+        if isinstance(u, int) and isinstance(v, int) and isinstance(c, int):
+            merged[u, v] = merged.get((u, v), 0) + c
+        else:
+            other.append((u, v, c))
+    canonical = [(u, v, c) for (u, v), c in merged.items()] + other
+    canonical.sort(key=_sort_key)
+    return canonical
+
+
+def _digest(text):
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def fingerprint(n, edges):
+    lines = [f"{n}"] + [f"{u} {v} {c}" for u, v, c in canonical_edges(edges)]
+    return _digest("\n".join(lines))
+
+
+# colours start as "s", "t" or "" and are refined from the (capacity, colour) pairs of
+# each vertex's out- and in-edges for the given number of rounds. malformed graphs fall
+# back to fingerprint
+def wl_hash(n, edges, s=0, t=None, rounds=3):
+    t = n - 1 if t is None else t
+    edges = canonical_edges(edges)
+    if any(not isinstance(x, int) for edge in edges for x in edge):
+        return fingerprint(n, edges)
+    # an endpoint outside the graph has no vertex to colour
+    if any(not 0 <= x < n for u, v, _ in edges for x in (u, v)):
+        return fingerprint(n, edges)
+    out = [[] for _ in range(n)]
+    into = [[] for _ in range(n)]
+    for u, v, c in edges:
+        out[u].append((c, v))
+        into[v].append((c, u))
+    colours = ["s" if v == s else "t" if v == t else "" for v in range(n)]
+    for _ in range(rounds):
+        refined = []
+        for v in range(n):
+            outs = sorted(f"{c}:{colours[w]}" for c, w in out[v])
+            ins = sorted(f"{c}:{colours[w]}" for c, w in into[v])
+            refined.append(_digest(f"{colours[v]}|{','.join(outs)}|{','.join(ins)}"))
+        colours = refined
+    return _digest(f"{n}|{len(edges)}|{','.join(sorted(colours))}")
+
+
+class Dedup:
+    # structural also treats relabellings with the same source and sink as duplicates
+    def __init__(self, structural=False, rounds=3):
+        self.structural = structural
+        self.rounds = rounds
+        self.seen = set()
+        self.dropped = 0
+
+    def key(self, n, edges, s=0, t=None):
+        if self.structural:
+            return wl_hash(n, edges, s, t, self.rounds)
+        return fingerprint(n, edges)
+
+    # true the first time a graph is seen
+    def add(self, n, edges, s=0, t=None):
+        key = self.key(n, edges, s, t)
+        if key in self.seen:
+            self.dropped += 1
+            return False
+        self.seen.add(key)
+        return True
+
+
+# the graphs of a stream that dedup has not seen yet. a stream that keeps repeating
+# itself would never yield again, so with give_up it ends after that many duplicates
+# in a row, e.g. the length of a corpus that is cycled through
+def distinct(graphs, dedup, give_up=None):
+    repeats = 0
+    for graph in graphs:
+        if dedup.add(graph.n, graph.edges):
+            repeats = 0
+            yield graph
+        else:
+            repeats += 1
+            if give_up is not None and repeats >= give_up:
+                return
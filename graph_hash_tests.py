@@ -0,0 +1,116 @@
+import itertools
+import unittest
+from graph import Graph
+from graph_hash import Dedup, canonical_edges, distinct, fingerprint, wl_hash
+
+
+def relabel(edges, mapping):
+    return [(mapping[u], mapping[v], c) for u, v, c in edges]
+
+
+# 0 -> {1, 2} -> 3 with different capacities on the two branches
+DIAMOND = [(0, 1, 1), (0, 2, 2), (1, 3, 3), (2, 3, 4)]
+
+
+class CanonicalTests(unittest.TestCase):
+    def test_sorted_and_parallel_edges_merged(self):
+        edges = [(1, 2, 4), (0, 1, 2), (0, 1, 3)]
+        self.assertEqual(canonical_edges(edges), [(0, 1, 5), (1, 2, 4)])
+
+    def test_non_integer_edges_kept(self):
+        edges = [(0, 1, "x"), (0, 1, 2), (0, 1, 3)]
+        self.assertEqual(canonical_edges(edges), [(0, 1, 5), (0, 1, "x")])
+
+    def test_graph_canonical(self):
+        graph = Graph(3)
+        graph.add_edge(1, 2, 4)
+        graph.add_edge(0, 1, 2)
+        graph.add_edge(0, 1, 3)
+        self.assertEqual(str(graph.canonical()), "3 2\n0 1 5\n1 2 4\n")
+
+
+class FingerprintTests(unittest.TestCase):
+    def test_edge_order_and_parallel_edges(self):
+        a = fingerprint(3, [(0, 1, 2), (0, 1, 3), (1, 2, 4)])
+        b = fingerprint(3, [(1, 2, 4), (0, 1, 5)])
+        self.assertEqual(a, b)
+
+    def test_differs_on_capacity_and_size(self):
+        base = fingerprint(3, [(0, 1, 5), (1, 2, 4)])
+        self.assertNotEqual(base, fingerprint(3, [(0, 1, 5), (1, 2, 3)]))
+        self.assertNotEqual(base, fingerprint(4, [(0, 1, 5), (1, 2, 4)]))
+
+    def test_relabelling_changes_it(self):
+        swapped = relabel(DIAMOND, {0: 0, 1: 2, 2: 1, 3: 3})
+        self.assertNotEqual(fingerprint(4, DIAMOND), fingerprint(4, swapped))
+
+
+class WLHashTests(unittest.TestCase):
+    def test_relabel_invariant(self):
+        swapped = relabel(DIAMOND, {0: 0, 1: 2, 2: 1, 3: 3})
+        self.assertEqual(wl_hash(4, DIAMOND), wl_hash(4, swapped))
+
+    def test_source_and_sink_fixed(self):
+        # the same graph with source and sink exchanged is a different problem
+        reversed_ends = relabel(DIAMOND, {0: 3, 1: 1, 2: 2, 3: 0})
+        self.assertNotEqual(wl_hash(4, DIAMOND), wl_hash(4, reversed_ends))
+        self.assertNotEqual(wl_hash(4, DIAMOND, 0, 3), wl_hash(4, DIAMOND, 1, 3))
+
+    def test_relabelled_ends_follow_s_and_t(self):
+        mapping = {0: 2, 1: 0, 2: 3, 3: 1}
+        moved = relabel(DIAMOND, mapping)
+        self.assertEqual(wl_hash(4, DIAMOND, 0, 3), wl_hash(4, moved, 2, 1))
+
+    def test_capacities_matter(self):
+        changed = [(0, 1, 1), (0, 2, 2), (1, 3, 3), (2, 3, 5)]
+        self.assertNotEqual(wl_hash(4, DIAMOND), wl_hash(4, changed))
+
+    def test_malformed_falls_back_to_fingerprint(self):
+        edges = [(0, 1, "x")]
+        self.assertEqual(wl_hash(2, edges), fingerprint(2, edges))
+
+    def test_vertex_past_n_falls_back(self):
+        edges = [(0, 1, 5), (1, 2, 3)]
+        self.assertEqual(wl_hash(2, edges), fingerprint(2, edges))
+
+    def test_negative_vertex_does_not_alias(self):
+        # -1 would otherwise index the last vertex
+        negative = [(0, -1, 5)]
+        last = [(0, 1, 5)]
+        self.assertEqual(wl_hash(2, negative), fingerprint(2, negative))
+        self.assertNotEqual(wl_hash(2, negative), wl_hash(2, last))
+
+
+class DedupTests(unittest.TestCase):
+    def test_exact(self):
+        dedup = Dedup()
+        self.assertTrue(dedup.add(4, DIAMOND))
+        self.assertFalse(dedup.add(4, list(reversed(DIAMOND))))
+        self.assertTrue(dedup.add(4, relabel(DIAMOND, {0: 0, 1: 2, 2: 1, 3: 3})))
+        self.assertEqual(dedup.dropped, 1)
+
+    def test_structural(self):
+        dedup = Dedup(structural=True)
+        self.assertTrue(dedup.add(4, DIAMOND))
+        self.assertFalse(dedup.add(4, relabel(DIAMOND, {0: 0, 1: 2, 2: 1, 3: 3})))
+        self.assertEqual(dedup.dropped, 1)
+
+    def test_distinct_over_cycling_stream_ends(self):
+        graphs = []
+        for c in (1, 2, 3):
+            graph = Graph(2)
+            graph.add_edge(0, 1, c)
+            graphs.append(graph)
+        dedup = Dedup()
+        found = list(distinct(itertools.cycle(graphs), dedup, give_up=len(graphs)))
+        self.assertEqual(found, graphs)
+        self.assertEqual(dedup.dropped, len(graphs))
+
+    def test_distinct_without_give_up(self):
+        graph = Graph(2)
+        graph.add_edge(0, 1, 1)
+        self.assertEqual(list(distinct([graph, graph], Dedup())), [graph])
+
+
+if __name__ == "__main__":
+    unittest.main()
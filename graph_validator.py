@@ -0,0 +1,197 @@
+import argparse
+import random
+import re
+
+# local model of how the site reads the 0-indexed "n m" / "u v w" graph input. the
+# messages are the ones the site shows in #error_messages_graph_input and #draw-err
+
+# JavaScript parseInt: optional sign, then a hex or decimal prefix, anything after it
+# is ignored and no digits at all is NaN
+_JS_INT = re.compile(r"\s*([+-]?)(0[xX][0-9a-fA-F]+|\d+)")
+
+READ_ERROR = "Error trying to read line {}"
+INVALID_U = "Invalid u in line {}"
+INVALID_V = "Invalid v in line {}"
+EMPTY_GRAPH = "Graph cannot be empty"
+NOT_CONNECTED = "Source and sink is not connected"
+FLOW_NOT_CONNECTED = "graph must be connected for flows"
+SAME_VERTEX = "The source vertex is the same as the sink vertex"
+NO_SOURCE = "The source vertex does not exist in the graph"
+NO_SINK = "The sink vertex does not exist in the graph"
+
+
+class GraphInputError(ValueError):
+    def __init__(self, message, line):
+        super().__init__(message)
+        self.line = line
+
+
+def parse_int(token):
+    match = _JS_INT.match(token)
+    if match is None:
+        return None
+    sign, digits = match.groups()
+    value = int(digits, 16) if digits[:2] in ("0x", "0X") else int(digits)
+    return -value if sign == "-" else value
+
+
+def _ints(line, count, line_no):
+    tokens = line.split()
+    values = [parse_int(tok) for tok in tokens[:count]]
+    if len(values) < count or None in values:
+        raise GraphInputError(READ_ERROR.format(line_no), line_no)
+    return values
+
+
+# returns (n, edges) or raises GraphInputError with the message the site would show
+def parse(text):
+    lines = str(text).split("\n")
+    n, m = _ints(lines[0], 2, 1)
+    edges = []
+    for line_no in range(2, m + 2):
+        line = lines[line_no - 1] if line_no <= len(lines) else ""
+        u, v, w = _ints(line, 3, line_no)
+        if not 0 <= u < n:
+            raise GraphInputError(INVALID_U.format(line_no), line_no)
+        if not 0 <= v < n:
+            raise GraphInputError(INVALID_V.format(line_no), line_no)
+        edges.append((u, v, w))
+    return n, edges
+
+
+def _reaches(n, edges, s, t):
+    adj = [[] for _ in range(n)]
+    for u, v, _ in edges:
+        adj[u].append(v)
+    seen = [False] * n
+    seen[s] = True
+    stack = [s]
+    while stack:
+        for v in adj[stack.pop()]:
+            if not seen[v]:
+                seen[v] = True
+                stack.append(v)
+    return seen[t]
+
+
+# flow is the "Flow" graph drawing type, which also rejects graphs where the sink
+# n - 1 cannot be reached from the source 0
+def input_error(text, flow=False):
+    try:
+        n, edges = parse(text)
+    except GraphInputError as e:
+        return str(e)
+    if flow and n > 0 and not _reaches(n, edges, 0, n - 1):
+        return FLOW_NOT_CONNECTED
+    return None
+
+
+def is_valid(text, flow=False):
+    return input_error(text, flow) is None
+
+
+# what #draw-err shows once a well-formed graph is drawn with source 0 and sink n - 1
+def draw_error(text):
+    n, edges = parse(text)
+    if n == 0:
+        return EMPTY_GRAPH
+    return None if _reaches(n, edges, 0, n - 1) else NOT_CONNECTED
+
+
+# what #<algorithm>-err shows for the source and sink fields
+def algorithm_error(n, s, t):
+    if not 0 <= s < n:
+        return NO_SOURCE
+    if not 0 <= t < n:
+        return NO_SINK
+    if s == t:
+        return SAME_VERTEX
+    return None
+
+
+def agrees(predicted, actual):
+    if predicted is None or actual is None:
+        return predicted == actual
+    return predicted in actual
+
+
+# checks every `every`-th prediction against the real site, so a fuzzing run notices
+# when the site changes how it reports errors
+class Conformance:
+    def __init__(self, site_manager, every=100, flow=False):
+        self.site_manager = site_manager
+        self.every = every
+        self.flow = flow
+        self.calls = 0
+        self.checked = 0
+        self.mismatches = []
+
+    def site_input_error(self, text):
+        from selenium.common.exceptions import NoSuchElementException
+
+        self.site_manager.open_graph_input(not self.flow)
+        self.site_manager.set_graph(text, False)
+        try:
+            return self.site_manager.get_input_error() or None
+        except NoSuchElementException:
+            return None
+
+    def check(self, text):
+        predicted = input_error(text, self.flow)
+        self.calls += 1
+        if self.every and self.calls % self.every == 0:
+            self.checked += 1
+            actual = self.site_input_error(text)
+            # the site may wrap the message, so containment is enough
+            if not agrees(predicted, actual):
+                self.mismatches.append((text, predicted, actual))
+        return predicted
+
+
+# malformed variants of a well-formed graph, one broken token each
+def mutations(n, edges, rng):
+    bad_tokens = ["invalid", "*&*#$@", "SELECT * FROM users", ""]
+    while True:
+        lines = [f"{n} {len(edges)}"] + [f"{u} {v} {w}" for u, v, w in edges]
+        i = rng.randrange(1, len(lines)) if edges else 0
+        tokens = lines[i].split()
+        j = rng.randrange(len(tokens))
+        kind = rng.randrange(3)
+        if kind == 0:
+            tokens[j] = rng.choice(bad_tokens)
+        elif kind == 1 and i > 0:
+            tokens[rng.randrange(2)] = str(n + rng.randrange(3))
+        else:
+            tokens[j] = str(-rng.randrange(1, 5))
+        lines[i] = " ".join(tokens)
+        yield "\n".join(lines) + "\n"
+
+
+def main():
+    from graph_gen import generate
+    from utils import URL, SiteManager
+
+    parser = argparse.ArgumentParser(
+        description="check local input error predictions against the site"
+    )
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--cases", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    graph = generate("sparse", 6, args.seed)
+    cases = mutations(graph.n, graph.edges, rng)
+    site_manager = SiteManager(args.url)
+    site_manager.close_instructions()
+    conformance = Conformance(site_manager, every=1)
+    for _ in range(args.cases):
+        conformance.check(next(cases))
+    for text, predicted, actual in conformance.mismatches:
+        print(f"predicted {predicted!r}, site said {actual!r} for:\n{text}")
+    agreed = conformance.checked - len(conformance.mismatches)
+    print(f"{agreed}/{conformance.checked} agree")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import importlib.util
+import random
+import unittest
+import graph_validator
+from graph_validator import (
+    Conformance,
+    GraphInputError,
+    agrees,
+    algorithm_error,
+    draw_error,
+    input_error,
+    mutations,
+    parse,
+    parse_int,
+)
+
+
+class ParseIntTests(unittest.TestCase):
+    def test_like_javascript(self):
+        self.assertEqual(parse_int("12"), 12)
+        self.assertEqual(parse_int("  -3"), -3)
+        self.assertEqual(parse_int("+7"), 7)
+        self.assertEqual(parse_int("0x1F"), 31)
+        self.assertEqual(parse_int("5abc"), 5)
+        self.assertEqual(parse_int("2.9"), 2)
+
+    def test_nan(self):
+        for token in ("", "abc", "-", "*&*#$@", "x12"):
+            self.assertIsNone(parse_int(token), token)
+
+
+class ParseTests(unittest.TestCase):
+    def test_well_formed(self):
+        self.assertEqual(parse("3 2\n0 1 5\n1 2 4\n"), (3, [(0, 1, 5), (1, 2, 4)]))
+
+    def test_extra_lines_and_tokens_ignored(self):
+        self.assertEqual(parse("2 1 9\n0 1 5 extra\n1 0 3\n"), (2, [(0, 1, 5)]))
+
+    def test_errors_name_the_line(self):
+        cases = [
+            ("", "Error trying to read line 1"),
+            ("2 x\n", "Error trying to read line 1"),
+            ("2 1\n0 1\n", "Error trying to read line 2"),
+            ("2 2\n0 1 5\n", "Error trying to read line 3"),
+            ("2 1\n2 1 5\n", "Invalid u in line 2"),
+            ("2 2\n0 1 5\n1 -1 5\n", "Invalid v in line 3"),
+        ]
+        for text, message in cases:
+            with self.assertRaises(GraphInputError) as raised:
+                parse(text)
+            self.assertEqual(str(raised.exception), message, text)
+        self.assertEqual(raised.exception.line, 3)
+
+
+class ErrorTests(unittest.TestCase):
+    def test_input_error(self):
+        self.assertIsNone(input_error("2 1\n0 1 5\n"))
+        self.assertEqual(input_error("2 1\n0 x 5\n"), "Error trying to read line 2")
+        # only the flow drawing type needs the sink reachable
+        self.assertIsNone(input_error("2 1\n1 0 5\n"))
+        self.assertEqual(
+            input_error("2 1\n1 0 5\n", flow=True), graph_validator.FLOW_NOT_CONNECTED
+        )
+
+    def test_draw_error(self):
+        self.assertEqual(draw_error("0 0\n"), graph_validator.EMPTY_GRAPH)
+        self.assertEqual(draw_error("3 1\n0 1 5\n"), graph_validator.NOT_CONNECTED)
+        self.assertIsNone(draw_error("3 2\n0 1 5\n1 2 1\n"))
+
+    def test_algorithm_error(self):
+        self.assertEqual(algorithm_error(3, 3, 1), graph_validator.NO_SOURCE)
+        self.assertEqual(algorithm_error(3, 0, -1), graph_validator.NO_SINK)
+        self.assertEqual(algorithm_error(3, 1, 1), graph_validator.SAME_VERTEX)
+        self.assertIsNone(algorithm_error(3, 0, 2))
+
+    def test_agrees(self):
+        self.assertTrue(agrees(None, None))
+        self.assertTrue(agrees("Invalid u in line 2", "Error: Invalid u in line 2."))
+        self.assertFalse(agrees(None, "Invalid u in line 2"))
+        self.assertFalse(agrees("Invalid u in line 2", None))
+
+
+class FakeSite:
+    def __init__(self, error):
+        self.error = error
+
+    def open_graph_input(self, default):
+        pass
+
+    def set_graph(self, text, click_done):
+        self.text = text
+
+    def get_input_error(self):
+        return self.error
+
+
+@unittest.skipUnless(importlib.util.find_spec("selenium"), "needs selenium")
+class ConformanceTests(unittest.TestCase):
+    def test_checks_every_nth(self):
+        conformance = Conformance(FakeSite("Error trying to read line 2"), every=2)
+        for text in ["2 1\n0 x 5\n"] * 4:
+            conformance.check(text)
+        self.assertEqual((conformance.calls, conformance.checked), (4, 2))
+        self.assertEqual(conformance.mismatches, [])
+
+    def test_records_mismatch(self):
+        conformance = Conformance(FakeSite(""), every=1)
+        predicted = conformance.check("2 1\n0 x 5\n")
+        self.assertEqual(predicted, "Error trying to read line 2")
+        self.assertEqual(
+            conformance.mismatches,
+            [("2 1\n0 x 5\n", "Error trying to read line 2", None)],
+        )
+
+
+class MutationTests(unittest.TestCase):
+    def test_one_changed_line(self):
+        edges = [(0, 1, 5), (1, 2, 4)]
+        original = ["3 2", "0 1 5", "1 2 4"]
+        stream = mutations(3, edges, random.Random(0))
+        for _ in range(50):
+            lines = next(stream).rstrip("\n").split("\n")
+            changed = [a != b for a, b in zip(lines, original)]
+            self.assertLessEqual(sum(changed), 1)
+            self.assertFalse(changed[0])
+
+    def test_deterministic(self):
+        a = mutations(2, [(0, 1, 5)], random.Random(3))
+        b = mutations(2, [(0, 1, 5)], random.Random(3))
+        self.assertEqual([next(a) for _ in range(10)], [next(b) for _ in range(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,506 @@
+import argparse
+import io
+import math
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import unittest
+import selection
+
+DB = "history.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    started REAL NOT NULL,
+    git_rev TEXT,
+    browser_version TEXT,
+    label TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    algorithm TEXT,
+    n INTEGER,
+    m INTEGER,
+    outcome TEXT,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    seq INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS retries (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    step TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    name TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprints (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    site TEXT,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS selections (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    ran INTEGER NOT NULL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS results_run ON results(run_id);
+CREATE INDEX IF NOT EXISTS steps_result ON steps(result_id);
+CREATE INDEX IF NOT EXISTS results_name ON results(name);
+CREATE INDEX IF NOT EXISTS fingerprints_result ON fingerprints(result_id);
+CREATE INDEX IF NOT EXISTS metrics_result ON metrics(result_id);
+"""
+
+# test name prefix -> site algorithm id
+TEST_ALGORITHMS = {"ff": "fordfulkerson", "ek": "edmondskarp", "dinic": "dinic"}
+
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+class History:
+    def __init__(self, path=DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def start_run(self, kind, browser_version=None, label=None):
+        cur = self.conn.execute(
+            "INSERT INTO runs (kind, started, git_rev, browser_version, label) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (kind, time.time(), git_revision(), browser_version, label),
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    def set_browser_version(self, run_id, version):
+        self.conn.execute(
+            "UPDATE runs SET browser_version = ? WHERE id = ?", (version, run_id)
+        )
+        self.conn.commit()
+
+    # steps is a list of (step name, seconds) as kept in SiteManager.step_times,
+    # retries the steps whose wait had to be retried, as in SiteManager.retries, and
+    # metrics the heap metrics sampled after the run, {name: value}
+    def add_result(
+        self,
+        run_id,
+        name,
+        algorithm,
+        n,
+        m,
+        outcome,
+        duration,
+        steps=(),
+        retries=(),
+        metrics=None,
+    ):
+        cur = self.conn.execute(
+            "INSERT INTO results (run_id, name, algorithm, n, m, outcome, duration) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, name, algorithm, n, m, outcome, duration),
+        )
+        self.conn.executemany(
+            "INSERT INTO steps (result_id, seq, step, seconds) VALUES (?, ?, ?, ?)",
+            [(cur.lastrowid, i, step, sec) for i, (step, sec) in enumerate(steps)],
+        )
+        self.conn.executemany(
+            "INSERT INTO retries (result_id, step) VALUES (?, ?)",
+            [(cur.lastrowid, step) for step in retries],
+        )
+        self.conn.executemany(
+            "INSERT INTO metrics (result_id, name, value) VALUES (?, ?, ?)",
+            [(cur.lastrowid, k, v) for k, v in (metrics or {}).items()],
+        )
+        self.conn.commit()
+        return cur.lastrowid
+
+    # "run:<id>" or a git revision prefix
+    def select_runs(self, selector, kind):
+        if selector.startswith("run:"):
+            rows = self.conn.execute(
+                "SELECT id FROM runs WHERE id = ? AND kind = ?",
+                (int(selector[4:]), kind),
+            )
+        else:
+            rows = self.conn.execute(
+                "SELECT id FROM runs WHERE git_rev LIKE ? AND kind = ?",
+                (selector + "%", kind),
+            )
+        return [r[0] for r in rows]
+
+    # site is the served page's fingerprint and source the test body's hash
+    def add_fingerprint(self, result_id, site, source):
+        self.conn.execute(
+            "INSERT INTO fingerprints (result_id, site, source) VALUES (?, ?, ?)",
+            (result_id, site, source),
+        )
+        self.conn.commit()
+
+    # (run id, outcome, site, source) of the latest result of a test that actually
+    # ran. site and source are None unless it was a fingerprinted pass
+    def last_result(self, name):
+        return self.conn.execute(
+            "SELECT r.run_id, r.outcome, f.site, f.source FROM results r "
+            "LEFT JOIN fingerprints f ON f.result_id = r.id "
+            "WHERE r.name = ? AND r.outcome NOT IN ('skip', 'cached') "
+            "ORDER BY r.id DESC LIMIT 1",
+            (name,),
+        ).fetchone()
+
+    # decisions as returned by selection.select
+    def add_selections(self, run_id, decisions):
+        self.conn.executemany(
+            "INSERT INTO selections (run_id, name, ran, reason) VALUES (?, ?, ?, ?)",
+            [
+                (run_id, test_id.split(".")[-1], run, reason)
+                for test_id, (run, reason, _) in decisions.items()
+            ],
+        )
+        self.conn.commit()
+
+    # ids of the latest runs of a kind, newest first
+    def recent_runs(self, kind, limit=20):
+        rows = self.conn.execute(
+            "SELECT id FROM runs WHERE kind = ? ORDER BY started DESC LIMIT ?",
+            (kind, limit),
+        )
+        return [r[0] for r in rows]
+
+    # the latest revision and the one before it
+    def default_selectors(self, kind):
+        revs = []
+        for (rev,) in self.conn.execute(
+            "SELECT git_rev FROM runs WHERE kind = ? ORDER BY started DESC", (kind,)
+        ):
+            if rev and rev not in revs:
+                revs.append(rev)
+        if len(revs) < 2:
+            return None, revs[0] if revs else None
+        return revs[1], revs[0]
+
+    # {(test name, "total" or step name): [seconds, ...]} over passing results
+    def samples(self, run_ids):
+        samples = {}
+        if not run_ids:
+            return samples
+        marks = ",".join("?" * len(run_ids))
+        for name, duration in self.conn.execute(
+            f"SELECT name, duration FROM results WHERE run_id IN ({marks}) "
+            "AND outcome = 'pass'",
+            run_ids,
+        ):
+            samples.setdefault((name, "total"), []).append(duration)
+        for name, step, seconds in self.conn.execute(
+            "SELECT r.name, s.step, SUM(s.seconds) FROM steps s "
+            f"JOIN results r ON r.id = s.result_id WHERE r.run_id IN ({marks}) "
+            "AND r.outcome = 'pass' GROUP BY s.result_id, s.step",
+            run_ids,
+        ):
+            samples.setdefault((name, step), []).append(seconds)
+        return samples
+
+    # {(result name, metric): [value, ...]} over all results, in the order stored
+    def metrics(self, run_ids):
+        samples = {}
+        if not run_ids:
+            return samples
+        marks = ",".join("?" * len(run_ids))
+        for name, metric, value in self.conn.execute(
+            "SELECT r.name, x.name, x.value FROM metrics x "
+            f"JOIN results r ON r.id = x.result_id WHERE r.run_id IN ({marks}) "
+            "ORDER BY x.rowid",
+            run_ids,
+        ):
+            samples.setdefault((name, metric), []).append(value)
+        return samples
+
+    # {(test name, step): retried waits} over all results
+    def retries(self, run_ids):
+        if not run_ids:
+            return {}
+        marks = ",".join("?" * len(run_ids))
+        rows = self.conn.execute(
+            "SELECT r.name, t.step, COUNT(*) FROM retries t "
+            f"JOIN results r ON r.id = t.result_id WHERE r.run_id IN ({marks}) "
+            "GROUP BY r.name, t.step",
+            run_ids,
+        )
+        return {(name, step): count for name, step, count in rows}
+
+
+# two-sided p-value, normal approximation with tie and continuity correction
+def mann_whitney(a, b):
+    n1, n2 = len(a), len(b)
+    pooled = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    total = len(pooled)
+    r1 = 0.0
+    ties = 0
+    i = 0
+    while i < total:
+        j = i
+        while j + 1 < total and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        r1 += rank * sum(1 for k in range(i, j + 1) if pooled[k][1] == 0)
+        ties += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    u = r1 - n1 * (n1 + 1) / 2
+    mu = n1 * n2 / 2
+    var = n1 * n2 / 12 * ((total + 1) - ties / (total * (total - 1)))
+    if var <= 0:
+        return 1.0
+    z = (abs(u - mu) - 0.5) / math.sqrt(var)
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+# two-sided p-value of the difference in medians from resampling both sides. a tie
+# counts half, so equal samples do not look like a shift either way
+def bootstrap(a, b, resamples=2000, seed=0):
+    rng = random.Random(seed)
+    slower = 0.0
+    for _ in range(resamples):
+        da = statistics.median(rng.choices(a, k=len(a)))
+        db = statistics.median(rng.choices(b, k=len(b)))
+        slower += 1.0 if db > da else 0.5 if db == da else 0.0
+    frac = slower / resamples
+    return min(1.0, 2 * min(frac, 1 - frac))
+
+
+TESTS = {"mannwhitney": mann_whitney, "bootstrap": bootstrap}
+
+
+def compare(base, cand, test="mannwhitney", alpha=0.05, min_change=0.05, min_n=3):
+    rows = []
+    for key in sorted(set(base) & set(cand)):
+        a, b = base[key], cand[key]
+        ma, mb = statistics.median(a), statistics.median(b)
+        change = (mb - ma) / ma if ma else 0.0
+        if len(a) < min_n or len(b) < min_n:
+            rows.append((key, ma, mb, change, None, "n/a"))
+            continue
+        p = TESTS[test](a, b)
+        verdict = "ok"
+        if p < alpha and abs(change) >= min_change:
+            verdict = "REGRESSION" if change > 0 else "improved"
+        rows.append((key, ma, mb, change, p, verdict))
+    return rows
+
+
+def format_report(rows, show_all=False):
+    counts = {}
+    for row in rows:
+        counts[row[-1]] = counts.get(row[-1], 0) + 1
+    lines = [", ".join(f"{v}: {c}" for v, c in sorted(counts.items())) or "no samples"]
+    shown = [r for r in rows if show_all or r[-1] in ("REGRESSION", "improved")]
+    shown.sort(key=lambda r: -r[3])
+    for (name, step), ma, mb, change, p, verdict in shown:
+        p = "-" if p is None else f"{p:.3f}"
+        lines.append(
+            f"{verdict:>10} {change:+7.1%} {ma:8.3f}s -> {mb:8.3f}s p={p:>5}  "
+            f"{name} [{step}]"
+        )
+    return "\n".join(lines)
+
+
+def format_retries(retries):
+    lines = []
+    for (name, step), count in sorted(retries.items(), key=lambda kv: -kv[1]):
+        lines.append(f"{count:>5}x retried  {name} [{step}]")
+    return "\n".join(lines)
+
+
+# (name, algorithm, n, m, steps, retries) of a test that has run: its method name, the
+# algorithm its name abbreviates, and the graph size, step times and retried waits of
+# its site manager. a test without one has no size and no steps
+def describe_test(test):
+    name = test.id().split(".")[-1]
+    algorithm = TEST_ALGORITHMS.get(name.split("_")[1] if "_" in name else "")
+    site_manager = getattr(test, "site_manager", None)
+    if site_manager is None:
+        return name, algorithm, None, None, [], []
+    n, m = site_manager.graph_size()
+    return name, algorithm, n, m, site_manager.step_times, site_manager.retries
+
+
+# fingerprints maps test ids to (site, source) and is stored with every pass
+def result_class(history, run_id, fingerprints=None):
+    class HistoryResult(unittest.TextTestResult):
+        browser_version = None
+
+        def startTest(self, test):
+            super().startTest(test)
+            self.outcome = "pass"
+            self.started = time.perf_counter()
+
+        def addFailure(self, test, err):
+            super().addFailure(test, err)
+            self.outcome = "fail"
+
+        def addError(self, test, err):
+            super().addError(test, err)
+            self.outcome = "error"
+
+        def addSkip(self, test, reason):
+            super().addSkip(test, reason)
+            cached = reason.startswith(selection.CACHED_PASS)
+            self.outcome = "cached" if cached else "skip"
+
+        def stopTest(self, test):
+            super().stopTest(test)
+            duration = time.perf_counter() - self.started
+            name, algorithm, n, m, steps, retries = describe_test(test)
+            site_manager = getattr(test, "site_manager", None)
+            if site_manager is not None and HistoryResult.browser_version is None:
+                HistoryResult.browser_version = site_manager.browser_version()
+                history.set_browser_version(run_id, HistoryResult.browser_version)
+            result_id = history.add_result(
+                run_id, name, algorithm, n, m, self.outcome, duration, steps, retries
+            )
+            if fingerprints and self.outcome == "pass":
+                history.add_fingerprint(result_id, *fingerprints[test.id()])
+
+    return HistoryResult
+
+
+def flatten(suite):
+    tests = []
+    for item in suite:
+        tests += flatten(item) if isinstance(item, unittest.TestSuite) else [item]
+    return tests
+
+
+# with incremental, tests that passed before on the same site fingerprint and test
+# source are skipped as cached passes; full runs everything and says so in the report.
+# passes are only fingerprinted, and so only reusable later, in incremental runs.
+# reporter, a live_report.Reporter, also gets every result as it finishes
+def run_suite(
+    history, module, patterns, label, incremental=False, full=False, reporter=None
+):
+    import artifacts
+    import live_report
+    from utils import URL
+
+    run_id = history.start_run("suite", label=label)
+    loader = unittest.TestLoader()
+    if patterns:
+        loader.testNamePatterns = [p if "*" in p else f"*{p}*" for p in patterns]
+    suite = loader.loadTestsFromName(module)
+    tests = flatten(suite)
+    # fetching the site is only worth it when the fingerprint can skip something
+    site = None
+    if incremental:
+        site = selection.site_fingerprint(URL, os.environ.get("SITE_ARCHIVE"))
+    decisions = selection.select(history, tests, site, full or not incremental)
+    if incremental or full:
+        history.add_selections(run_id, decisions)
+        print(selection.format_selection(decisions))
+        selection.skip_cached(tests, decisions)
+    fingerprints = None
+    if site is not None:
+        fingerprints = {t: (site, source) for t, (_, _, source) in decisions.items()}
+    resultclass = result_class(history, run_id, fingerprints)
+    resultclass = artifacts.result_class(None, resultclass)
+    if reporter:
+        resultclass = live_report.result_class(reporter, resultclass)
+    # the runner's progress and tracebacks would be erased by the dashboard's redraws,
+    # so they are held back until the run is over
+    dashboard = reporter and reporter.dashboard
+    stream = io.StringIO() if dashboard else sys.stderr
+    runner = unittest.TextTestRunner(stream, resultclass=resultclass)
+    result = runner.run(suite)
+    if reporter:
+        reporter.close()
+    if dashboard:
+        sys.stderr.write(stream.getvalue())
+    print(f"stored as run {run_id}")
+    return result.wasSuccessful()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark history store")
+    parser.add_argument("--db", default=DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run-suite", help="run the browser tests and store timings")
+    run.add_argument("-k", dest="patterns", action="append")
+    run.add_argument("--module", default="max_flow_tests")
+    run.add_argument("--label")
+    run.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip tests that passed before on the same site and test source",
+    )
+    run.add_argument("--full", action="store_true", help="run every test anyway")
+    run.add_argument("--stream", help="append a json line per test here, - for stdout")
+    run.add_argument("--junit", help="junit xml file, rewritten after every test")
+    run.add_argument("--dashboard", action="store_true", help="live progress")
+    cmp = sub.add_parser("compare", help="flag regressions against a baseline")
+    cmp.add_argument("--kind", default="suite", help="suite, scaling or soak")
+    cmp.add_argument("--baseline", help="git revision prefix or run:<id>")
+    cmp.add_argument("--candidate", help="git revision prefix or run:<id>")
+    cmp.add_argument("--test", default="mannwhitney", choices=TESTS)
+    cmp.add_argument("--alpha", type=float, default=0.05)
+    cmp.add_argument("--min-change", type=float, default=0.05)
+    cmp.add_argument("--all", action="store_true", help="show unchanged rows too")
+    args = parser.parse_args()
+
+    history = History(args.db)
+    if args.command == "run-suite":
+        import live_report
+
+        reporter = None
+        if args.stream or args.junit or args.dashboard:
+            if args.dashboard and args.stream == "-":
+                parser.error("--stream - and --dashboard would both write to stdout")
+            dashboard = live_report.Dashboard(sys.stdout) if args.dashboard else None
+            reporter = live_report.Reporter(args.stream, args.junit, dashboard)
+        ok = run_suite(
+            history,
+            args.module,
+            args.patterns,
+            args.label,
+            args.incremental,
+            args.full,
+            reporter,
+        )
+        sys.exit(0 if ok else 1)
+
+    baseline, candidate = history.default_selectors(args.kind)
+    baseline = args.baseline or baseline
+    candidate = args.candidate or candidate
+    if not baseline or not candidate:
+        sys.exit("need runs from two revisions, or --baseline and --candidate")
+    base = history.samples(history.select_runs(baseline, args.kind))
+    cand = history.samples(history.select_runs(candidate, args.kind))
+    rows = compare(base, cand, args.test, args.alpha, args.min_change)
+    print(f"{args.kind}: {baseline} -> {candidate}")
+    print(format_report(rows, args.all))
+    retries = history.retries(history.select_runs(candidate, args.kind))
+    if retries:
+        print("flaky waits:")
+        print(format_retries(retries))
+    sys.exit(1 if any(r[-1] == "REGRESSION" for r in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import unittest
+from history import bootstrap, compare, describe_test, mann_whitney
+
+KEY = ("test_ff_wellformed_4nodes_connected", "run")
+
+
+class MannWhitneyTests(unittest.TestCase):
+    def test_identical_samples(self):
+        self.assertEqual(mann_whitney([1, 2, 3], [1, 2, 3]), 1.0)
+
+    def test_identical_constant_samples(self):
+        # every value tied, no variance left to test against
+        self.assertEqual(mann_whitney([2.0] * 5, [2.0] * 5), 1.0)
+
+    def test_separated_samples(self):
+        p = mann_whitney([1, 2, 3, 4, 5], [6, 7, 8, 9, 10])
+        self.assertLess(p, 0.05)
+        self.assertAlmostEqual(p, mann_whitney([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]))
+
+    def test_ties_across_samples(self):
+        p = mann_whitney([1, 2, 2, 3], [2, 2, 3, 3])
+        self.assertGreater(p, 0.05)
+        self.assertLess(p, 1.0)
+
+
+class BootstrapTests(unittest.TestCase):
+    def test_identical_constant_samples(self):
+        self.assertEqual(bootstrap([1.0] * 5, [1.0] * 5), 1.0)
+
+    def test_identical_samples(self):
+        self.assertGreater(bootstrap([1, 2, 3], [1, 2, 3]), 0.9)
+
+    def test_separated_samples(self):
+        self.assertEqual(bootstrap([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]), 0.0)
+
+    def test_seeded(self):
+        a, b = [1, 3, 2, 5, 4], [2, 4, 3, 6, 1]
+        self.assertEqual(bootstrap(a, b, seed=1), bootstrap(a, b, seed=1))
+
+
+class CompareTests(unittest.TestCase):
+    def verdict(self, a, b, **kwargs):
+        return compare({KEY: a}, {KEY: b}, **kwargs)[0][-1]
+
+    def test_regression_and_improvement(self):
+        fast, slow = [1.0, 1.1, 0.9, 1.0, 1.0], [2.0, 2.1, 1.9, 2.0, 2.0]
+        for test in ("mannwhitney", "bootstrap"):
+            self.assertEqual(self.verdict(fast, slow, test=test), "REGRESSION")
+            self.assertEqual(self.verdict(slow, fast, test=test), "improved")
+
+    def test_identical_samples_ok(self):
+        for test in ("mannwhitney", "bootstrap"):
+            self.assertEqual(self.verdict([1.0] * 5, [1.0] * 5, test=test), "ok")
+
+    def test_small_change_ok(self):
+        a = [1.00, 1.01, 1.02, 1.03, 1.04]
+        b = [1.05, 1.06, 1.07, 1.08, 1.09]
+        self.assertEqual(self.verdict(a, b, min_change=0.1), "ok")
+
+    def test_too_few_samples(self):
+        row = compare({KEY: [1.0, 1.0]}, {KEY: [2.0, 2.0]})[0]
+        self.assertEqual(row, (KEY, 1.0, 2.0, 1.0, None, "n/a"))
+
+    def test_only_shared_keys(self):
+        other = ("test_dinic", "run")
+        rows = compare({KEY: [1.0] * 3, other: [1.0] * 3}, {KEY: [1.0] * 3})
+        self.assertEqual([row[0] for row in rows], [KEY])
+
+
+class FakeSite:
+    step_times = [("run", 1.5)]
+    retries = ["dinic finish"]
+
+    def graph_size(self):
+        return 4, 5
+
+
+class Named(unittest.TestCase):
+    def test_ek_wellformed_4nodes(self):
+        pass
+
+    def test_plain(self):
+        pass
+
+
+class DescribeTestTests(unittest.TestCase):
+    def test_with_site_manager(self):
+        test = Named("test_ek_wellformed_4nodes")
+        test.site_manager = FakeSite()
+        self.assertEqual(
+            describe_test(test),
+            (
+                "test_ek_wellformed_4nodes",
+                "edmondskarp",
+                4,
+                5,
+                [("run", 1.5)],
+                ["dinic finish"],
+            ),
+        )
+
+    def test_without_site_manager(self):
+        self.assertEqual(
+            describe_test(Named("test_plain")), ("test_plain", None, None, None, [], [])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import argparse
+import importlib
+import multiprocessing
+import statistics
+import subprocess
+import sys
+import time
+
+# modules the graph, oracle and benchmark tooling imports, which must not pull in the
+# browser layer
+TOOLS = [
+    "artifacts",
+    "command_log",
+    "graph",
+    "graph_format",
+    "graph_gen",
+    "graph_hash",
+    "graph_validator",
+    "flow_check",
+    "history",
+    "live_report",
+    "selection",
+    "timeouts",
+    "scheduler",
+    "scaling",
+    "soak",
+    "utils",
+    "max_flow",
+    "op_counts",
+    "pair_sweep",
+    "page_archive",
+    "driver_pool",
+]
+BROWSER = ["selenium", "site_manager"]
+
+CHECK = "import sys, {}; print(','.join(m for m in {!r} if m in sys.modules))"
+
+
+def _run(code):
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+
+# median seconds to start an interpreter and import module, minus a bare start
+def import_time(module, repeat=5):
+    def median_run(code):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _run(code)
+            times.append(time.perf_counter() - start)
+        return statistics.median(times)
+
+    return median_run(f"import {module}") - median_run("pass")
+
+
+def browser_modules(module):
+    loaded = _run(CHECK.format(module, BROWSER)).stdout.strip()
+    return loaded.split(",") if loaded else []
+
+
+def _ready():
+    return True
+
+
+# seconds until a spawned pool of workers that each import module can take work
+def pool_startup(module, workers=4):
+    # a pool keeps replacing workers whose initializer fails, so check the import first
+    _run(f"import {module}")
+    context = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    with context.Pool(workers, importlib.import_module, (module,)) as pool:
+        pool.starmap(_ready, [()] * workers)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="check that the tooling imports without the browser layer"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--max-import", type=float, help="fail if a tool takes longer to import"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    for module in TOOLS:
+        seconds = import_time(module, args.repeat)
+        loaded = browser_modules(module)
+        note = f"  loads {', '.join(loaded)}" if loaded else ""
+        print(f"{module:<16} {seconds * 1000:7.1f} ms{note}")
+        slow = args.max_import is not None and seconds > args.max_import
+        failed = failed or bool(loaded) or slow
+
+    for module in ["graph_gen", "site_manager"]:
+        try:
+            seconds = pool_startup(module, args.workers)
+        except subprocess.CalledProcessError:
+            print(f"pool of {args.workers} importing {module}: cannot import")
+            continue
+        print(f"pool of {args.workers} importing {module}: {seconds:.2f}s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
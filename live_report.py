@@ -0,0 +1,290 @@
+import argparse
+import collections
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+import unittest
+from xml.sax.saxutils import escape, quoteattr
+import selection
+from history import describe_test
+
+# results as they happen: one json line per finished test or soak graph, an optional
+# junit file that is valid after every case, and a terminal dashboard over a sliding
+# window. records look like
+# {"name", "algorithm", "n", "m", "outcome", "duration", "steps", "worker", "time"}
+# with an optional "message" for failures
+
+FAILED = {"fail", "error"}
+
+
+# SITE_WORKER is set by scheduler.py for its shards
+def worker_id():
+    return os.environ.get("SITE_WORKER") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def record(name, algorithm, n, m, outcome, duration, steps=(), message=None):
+    r = {
+        "name": name,
+        "algorithm": algorithm,
+        "n": n,
+        "m": m,
+        "outcome": outcome,
+        "duration": round(duration, 4),
+        "steps": [[step, round(seconds, 4)] for step, seconds in steps],
+    }
+    if message:
+        r["message"] = message
+    return r
+
+
+# every case overwrites the closing tag and writes it again after itself
+class JUnitWriter:
+    CLOSE = "</testsuite>\n"
+
+    def __init__(self, path, name="max_flow_tests"):
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write('<?xml version="1.0" encoding="utf-8"?>\n')
+        self.file.write(f"<testsuite name={quoteattr(name)}>\n")
+        self.end = self.file.tell()
+        self.file.write(self.CLOSE)
+        self.file.flush()
+
+    def add(self, r):
+        attrs = (
+            f"classname={quoteattr(r['algorithm'] or 'none')} "
+            f"name={quoteattr(r['name'])} time=\"{r['duration']:.3f}\""
+        )
+        body = ""
+        message = quoteattr(r.get("message", ""))
+        if r["outcome"] == "fail":
+            body += f"<failure message={message}/>"
+        elif r["outcome"] == "error":
+            body += f"<error message={message}/>"
+        elif r["outcome"] in ("skip", "cached"):
+            body += "<skipped/>"
+        steps = "\n".join(f"{step} {seconds:.3f}s" for step, seconds in r["steps"])
+        if steps:
+            body += f"<system-out>{escape(steps)}</system-out>"
+        self.file.seek(self.end)
+        self.file.write(f"  <testcase {attrs}>{body}</testcase>\n")
+        self.end = self.file.tell()
+        self.file.write(self.CLOSE)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# cases per second, error rate and the slowest steps over the last window seconds,
+# redrawn at most every `every` seconds. without a terminal it prints plain lines.
+# the redraw erases the lines it drew last, so while it runs everything else meant
+# for the terminal goes through note, or somewhere else
+class Dashboard:
+    def __init__(self, out=sys.stderr, window=60.0, every=1.0, top=3):
+        self.out = out
+        self.window = window
+        self.every = every
+        self.top = top
+        self.recent = collections.deque()
+        self.total = collections.Counter()
+        self.workers = set()
+        self.drawn = 0
+        self.last_draw = 0.0
+        self.tty = out.isatty()
+
+    def add(self, r):
+        now = r.get("time")
+        if now is None:
+            now = time.time()
+        self.recent.append((now, r))
+        while self.recent and self.recent[0][0] < now - self.window:
+            self.recent.popleft()
+        self.total[r["outcome"]] += 1
+        self.workers.add(r.get("worker"))
+        if time.monotonic() - self.last_draw >= self.every:
+            self.draw()
+
+    def lines(self):
+        records = [r for _, r in self.recent]
+        span = self.recent[-1][0] - self.recent[0][0] if len(self.recent) > 1 else 0
+        rate = (len(records) - 1) / span if span else 0.0
+        errors = sum(1 for r in records if r["outcome"] in FAILED)
+        error_rate = errors / len(records) if records else 0.0
+        done = sum(self.total.values())
+        failed = sum(self.total[o] for o in FAILED)
+        lines = [
+            f"{done} done, {failed} failed, {len(self.workers)} workers | "
+            f"last {self.window:.0f}s: {rate:.2f} cases/s, {error_rate:.1%} errors"
+        ]
+        steps = collections.defaultdict(list)
+        for r in records:
+            for step, seconds in r["steps"]:
+                steps[step].append(seconds)
+        slowest = sorted(steps.items(), key=lambda kv: -statistics.median(kv[1]))
+        for step, times in slowest[: self.top]:
+            lines.append(
+                f"  {step:<28} median {statistics.median(times):6.2f}s "
+                f"max {max(times):6.2f}s x{len(times)}"
+            )
+        return lines
+
+    # back to the first line of the last drawing, and clear below it
+    def _erase(self):
+        if self.tty and self.drawn:
+            self.out.write(f"\x1b[{self.drawn}F\x1b[J")
+            self.drawn = 0
+
+    def draw(self):
+        lines = self.lines()
+        if self.tty:
+            self._erase()
+            self.out.write("\n".join(lines) + "\n")
+            self.drawn = len(lines)
+        else:
+            self.out.write(lines[0] + "\n")
+        self.out.flush()
+        self.last_draw = time.monotonic()
+
+    # a log line printed above the dashboard
+    def note(self, line):
+        self._erase()
+        self.out.write(line + "\n")
+        if self.tty and self.recent:
+            self.draw()
+        self.out.flush()
+
+
+# stream is a path to append json lines to, or "-" for stdout
+class Reporter:
+    def __init__(self, stream=None, junit=None, dashboard=None, worker=None):
+        self.stream = None
+        if stream == "-":
+            self.stream = sys.stdout
+        elif stream:
+            self.stream = open(stream, "a", encoding="utf-8")
+        self.junit = JUnitWriter(junit) if junit else None
+        self.dashboard = dashboard
+        self.worker = worker or worker_id()
+
+    def add(self, r):
+        r = {**r, "worker": self.worker, "time": round(time.time(), 3)}
+        if self.stream:
+            # one write per line, so shards can append to the same file
+            self.stream.write(json.dumps(r) + "\n")
+            self.stream.flush()
+        if self.junit:
+            self.junit.add(r)
+        if self.dashboard:
+            self.dashboard.add(r)
+
+    def close(self):
+        if self.stream and self.stream is not sys.stdout:
+            self.stream.close()
+        if self.junit:
+            self.junit.close()
+        if self.dashboard:
+            self.dashboard.draw()
+
+
+def _message(err):
+    return "".join(str(err[1]).splitlines()[:1]) or err[0].__name__
+
+
+def result_class(reporter, base=unittest.TextTestResult):
+    class LiveResult(base):
+        def startTest(self, test):
+            super().startTest(test)
+            self.live_outcome = "pass"
+            self.live_message = None
+            self.live_started = time.perf_counter()
+
+        def addFailure(self, test, err):
+            super().addFailure(test, err)
+            self.live_outcome = "fail"
+            self.live_message = _message(err)
+
+        def addError(self, test, err):
+            super().addError(test, err)
+            self.live_outcome = "error"
+            self.live_message = _message(err)
+
+        def addSkip(self, test, reason):
+            super().addSkip(test, reason)
+            cached = reason.startswith(selection.CACHED_PASS)
+            self.live_outcome = "cached" if cached else "skip"
+            self.live_message = reason
+
+        def stopTest(self, test):
+            super().stopTest(test)
+            duration = time.perf_counter() - self.live_started
+            name, algorithm, n, m, steps, _ = describe_test(test)
+            reporter.add(
+                record(
+                    name,
+                    algorithm,
+                    n,
+                    m,
+                    self.live_outcome,
+                    duration,
+                    steps,
+                    self.live_message,
+                )
+            )
+
+    return LiveResult
+
+
+# yields records appended to path after byte offset start, until done() is true and
+# nothing new has arrived
+def follow(path, done=lambda: False, start=0, interval=0.2):
+    while not os.path.exists(path):
+        if done():
+            return
+        time.sleep(interval)
+    with open(path, encoding="utf-8") as f:
+        f.seek(start)
+        partial = ""
+        while True:
+            line = f.readline()
+            if not line:
+                if done():
+                    return
+                time.sleep(interval)
+                continue
+            partial += line
+            if partial.endswith("\n"):
+                try:
+                    yield json.loads(partial)
+                except ValueError:
+                    pass
+                partial = ""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="live dashboard over a json lines results stream"
+    )
+    parser.add_argument("stream", help="file written with --stream")
+    parser.add_argument("--window", type=float, default=60.0, help="seconds")
+    parser.add_argument("--top", type=int, default=3, help="slowest steps to show")
+    parser.add_argument(
+        "--from-start", action="store_true", help="replay the existing lines too"
+    )
+    args = parser.parse_args()
+
+    dashboard = Dashboard(window=args.window, top=args.top)
+    start = 0
+    if not args.from_start and os.path.exists(args.stream):
+        start = os.path.getsize(args.stream)
+    try:
+        for r in follow(args.stream, start=start):
+            dashboard.add(r)
+    except KeyboardInterrupt:
+        dashboard.draw()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from live_report import Dashboard, JUnitWriter, follow, record
+
+
+class JUnitWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "junit.xml")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_valid_after_every_add(self):
+        writer = JUnitWriter(self.path)
+        self.assertEqual(len(ET.parse(self.path).getroot()), 0)
+        cases = [
+            record("test_ff_a", "fordfulkerson", 2, 1, "pass", 0.5, [("click", 0.1)]),
+            record("test_ek_b", "edmondskarp", 3, 2, "fail", 1.0, [], "1 != <2> & 3"),
+            record("test_dinic_c", "dinic", None, None, "error", 0.1, [], "boom"),
+            record("test_other", None, None, None, "cached", 0.0),
+        ]
+        for i, case in enumerate(cases, 1):
+            writer.add(case)
+            root = ET.parse(self.path).getroot()
+            self.assertEqual(root.tag, "testsuite")
+            self.assertEqual(len(root), i)
+        writer.close()
+        root = ET.parse(self.path).getroot()
+        ok, failed, errored, cached = root
+        self.assertEqual(ok.get("classname"), "fordfulkerson")
+        self.assertEqual(ok.find("system-out").text, "click 0.100s")
+        self.assertEqual(failed.find("failure").get("message"), "1 != <2> & 3")
+        self.assertEqual(errored.find("error").get("message"), "boom")
+        self.assertIsNotNone(cached.find("skipped"))
+        self.assertEqual(cached.get("classname"), "none")
+
+
+class FollowTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "results.jsonl")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_partial_lines_joined(self):
+        first = json.dumps({"name": "a"})
+        second = json.dumps({"name": "b"})
+        with open(self.path, "w") as f:
+            f.write(first + "\n" + second[:5])
+        # the rest of the line arrives while follow waits
+        calls = []
+
+        def done():
+            calls.append(1)
+            if len(calls) == 1:
+                with open(self.path, "a") as f:
+                    f.write(second[5:] + "\n")
+                return False
+            return True
+
+        records = list(follow(self.path, done, interval=0))
+        self.assertEqual([r["name"] for r in records], ["a", "b"])
+
+    def test_start_offset_and_bad_lines(self):
+        with open(self.path, "w") as f:
+            f.write('{"name": "old"}\n')
+        start = os.path.getsize(self.path)
+        with open(self.path, "a") as f:
+            f.write("not json\n" + '{"name": "new"}\n')
+        records = list(follow(self.path, lambda: True, start, interval=0))
+        self.assertEqual(records, [{"name": "new"}])
+
+    def test_missing_file(self):
+        self.assertEqual(list(follow(self.path, lambda: True, interval=0)), [])
+
+
+def result(outcome, t, steps=(), worker="w0"):
+    r = record("test", "dinic", 4, 3, outcome, 1.0, steps)
+    return {**r, "time": t, "worker": worker}
+
+
+class DashboardTests(unittest.TestCase):
+    def test_lines(self):
+        board = Dashboard(io.StringIO(), window=60, every=1e9, top=2)
+        board.add(result("pass", 100, [("click", 0.1), ("finish", 2.0)]))
+        board.add(result("fail", 101, [("click", 0.3), ("finish", 4.0)], "w1"))
+        board.add(result("pass", 102, [("result", 1.0)]))
+        head, slowest, second = board.lines()
+        self.assertEqual(
+            head,
+            "3 done, 1 failed, 2 workers | last 60s: 1.00 cases/s, 33.3% errors",
+        )
+        self.assertTrue(slowest.strip().startswith("finish"))
+        self.assertIn("median   3.00s max   4.00s x2", slowest)
+        self.assertTrue(second.strip().startswith("result"))
+
+    def test_window_drops_old_results(self):
+        board = Dashboard(io.StringIO(), window=10, every=1e9)
+        board.add(result("error", 100))
+        board.add(result("pass", 120))
+        self.assertEqual(
+            board.lines()[0],
+            "2 done, 1 failed, 1 workers | last 10s: 0.00 cases/s, 0.0% errors",
+        )
+
+    def test_note_without_terminal(self):
+        out = io.StringIO()
+        board = Dashboard(out, every=0)
+        board.add(result("pass", 0))
+        board.note("graphs 0-49: median 1.00s")
+        self.assertEqual(out.getvalue().splitlines()[-1], "graphs 0-49: median 1.00s")
+
+
+if __name__ == "__main__":
+    unittest.main()
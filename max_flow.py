@@ -0,0 +1,205 @@
+import collections
+
+# local max flow oracle for expected values, and equivalent flow trees that give the
+# max flow of every pair of a symmetric graph from n - 1 oracle calls. the algorithms
+# take an optional counts dict and add their phases and augmenting paths to it
+
+
+# Dinic's algorithm on edges (u, v, capacity). returns the flow value and the source
+# side of a minimum cut as a list of bools
+def max_flow(n, edges, s, t, counts=None):
+    head, to, cap = _residual(n, edges)
+    counts = {} if counts is None else counts
+    value = 0
+    while True:
+        level = [-1] * n
+        level[s] = 0
+        queue = collections.deque([s])
+        while queue:
+            u = queue.popleft()
+            for e in head[u]:
+                if cap[e] > 0 and level[to[e]] < 0:
+                    level[to[e]] = level[u] + 1
+                    queue.append(to[e])
+        if level[t] < 0:
+            return value, [lv >= 0 for lv in level]
+        _count(counts, "phases")
+        pos = [0] * n
+        while True:
+            pushed = _augment(head, to, cap, level, pos, s, t)
+            if not pushed:
+                break
+            _count(counts, "augmentations")
+            value += pushed
+
+
+def _residual(n, edges):
+    head = [[] for _ in range(n)]
+    to = []
+    cap = []
+    for u, v, c in edges:
+        head[u].append(len(to))
+        to.append(v)
+        cap.append(c)
+        head[v].append(len(to))
+        to.append(u)
+        cap.append(0)
+    return head, to, cap
+
+
+def _count(counts, key):
+    counts[key] = counts.get(key, 0) + 1
+
+
+def _push(to, cap, path):
+    pushed = min(cap[e] for e in path)
+    for e in path:
+        cap[e] -= pushed
+        cap[e ^ 1] += pushed
+    return pushed
+
+
+# augmenting along shortest paths found by bfs
+def edmonds_karp(n, edges, s, t, counts=None):
+    head, to, cap = _residual(n, edges)
+    counts = {} if counts is None else counts
+    value = 0
+    while True:
+        via = [-1] * n
+        seen = [False] * n
+        seen[s] = True
+        queue = collections.deque([s])
+        while queue and not seen[t]:
+            u = queue.popleft()
+            for e in head[u]:
+                if cap[e] > 0 and not seen[to[e]]:
+                    seen[to[e]] = True
+                    via[to[e]] = e
+                    queue.append(to[e])
+        if not seen[t]:
+            return value, seen
+        path = []
+        v = t
+        while v != s:
+            path.append(via[v])
+            v = to[via[v] ^ 1]
+        _count(counts, "augmentations")
+        value += _push(to, cap, path)
+
+
+# augmenting along any path, found by dfs
+def ford_fulkerson(n, edges, s, t, counts=None):
+    head, to, cap = _residual(n, edges)
+    counts = {} if counts is None else counts
+    value = 0
+    while True:
+        via = [-1] * n
+        seen = [False] * n
+        seen[s] = True
+        stack = [s]
+        while stack and not seen[t]:
+            u = stack.pop()
+            for e in head[u]:
+                if cap[e] > 0 and not seen[to[e]]:
+                    seen[to[e]] = True
+                    via[to[e]] = e
+                    stack.append(to[e])
+        if not seen[t]:
+            return value, seen
+        path = []
+        v = t
+        while v != s:
+            path.append(via[v])
+            v = to[via[v] ^ 1]
+        _count(counts, "augmentations")
+        value += _push(to, cap, path)
+
+
+# one blocking-flow path, iteratively so deep graphs do not hit the recursion limit
+def _augment(head, to, cap, level, pos, s, t):
+    path = []
+    u = s
+    while u != t:
+        while pos[u] < len(head[u]):
+            e = head[u][pos[u]]
+            if cap[e] > 0 and level[to[e]] == level[u] + 1:
+                break
+            pos[u] += 1
+        else:
+            if u == s:
+                return 0
+            # dead end: retreat and skip the edge that led here
+            level[u] = -1
+            e = path.pop()
+            u = to[e ^ 1]
+            pos[u] += 1
+            continue
+        path.append(e)
+        u = to[e]
+    return _push(to, cap, path)
+
+
+# site algorithm id -> local implementation
+ALGORITHMS = {
+    "fordfulkerson": ford_fulkerson,
+    "edmondskarp": edmonds_karp,
+    "dinic": max_flow,
+}
+
+
+def is_symmetric(n, edges):
+    caps = collections.Counter()
+    for u, v, c in edges:
+        if u != v:
+            caps[u, v] += c
+    return all(caps[v, u] == c for (u, v), c in caps.items())
+
+
+# Gusfield's equivalent flow tree: parent[i] and weight[i] for every i > 0, such that
+# the max flow between two vertices is the smallest weight on their tree path
+def flow_tree(n, edges):
+    parent = [0] * n
+    weight = [0] * n
+    for s in range(1, n):
+        t = parent[s]
+        weight[s], side = max_flow(n, edges, s, t)
+        for i in range(s + 1, n):
+            if side[i] and parent[i] == t:
+                parent[i] = s
+    return parent, weight
+
+
+def tree_values(parent, weight):
+    n = len(parent)
+    adj = [[] for _ in range(n)]
+    for i in range(1, n):
+        adj[i].append((parent[i], weight[i]))
+        adj[parent[i]].append((i, weight[i]))
+    values = [[0] * n for _ in range(n)]
+    for root in range(n):
+        row = values[root]
+        seen = [False] * n
+        seen[root] = True
+        stack = [(root, float("inf"))]
+        while stack:
+            u, low = stack.pop()
+            for v, w in adj[u]:
+                if not seen[v]:
+                    seen[v] = True
+                    row[v] = min(low, w)
+                    stack.append((v, row[v]))
+        row[root] = 0
+    return values
+
+
+# values[s][t] for every pair, and the number of oracle calls it took: n - 1 through a
+# flow tree when the capacities are symmetric, one per ordered pair otherwise
+def all_pairs(n, edges):
+    if is_symmetric(n, edges):
+        return tree_values(*flow_tree(n, edges)), max(n - 1, 0)
+    values = [[0] * n for _ in range(n)]
+    for s in range(n):
+        for t in range(n):
+            if s != t:
+                values[s][t] = max_flow(n, edges, s, t)[0]
+    return values, n * (n - 1)
@@ -0,0 +1,100 @@
+import itertools
+import random
+import unittest
+from max_flow import (
+    ALGORITHMS,
+    all_pairs,
+    edmonds_karp,
+    flow_tree,
+    ford_fulkerson,
+    is_symmetric,
+    max_flow,
+    tree_values,
+)
+
+
+# capacity of the smallest cut separating s from t, over every vertex subset
+def brute_force(n, edges, s, t):
+    others = [x for x in range(n) if x not in (s, t)]
+    best = None
+    for k in range(len(others) + 1):
+        for extra in itertools.combinations(others, k):
+            side = {s, *extra}
+            cut = sum(c for u, v, c in edges if u in side and v not in side)
+            best = cut if best is None else min(best, cut)
+    return best
+
+
+def random_graph(rng, n, m, symmetric=False):
+    edges = []
+    for _ in range(m):
+        u, v = rng.randrange(n), rng.randrange(n)
+        c = rng.randint(0, 9)
+        edges.append((u, v, c))
+        if symmetric:
+            edges.append((v, u, c))
+    return edges
+
+
+class MaxFlowTests(unittest.TestCase):
+    def test_against_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            n = rng.randint(2, 7)
+            edges = random_graph(rng, n, rng.randint(0, 14))
+            s, t = rng.sample(range(n), 2)
+            expected = brute_force(n, edges, s, t)
+            for name, algorithm in ALGORITHMS.items():
+                value, side = algorithm(n, edges, s, t)
+                self.assertEqual(value, expected, (name, n, edges, s, t))
+                # the reachable side is a minimum cut
+                self.assertTrue(side[s] and not side[t])
+                cut = sum(c for u, v, c in edges if side[u] and not side[v])
+                self.assertEqual(cut, expected, (name, n, edges, s, t))
+
+    def test_counts(self):
+        # two disjoint paths of one unit each, one level graph
+        edges = [(0, 1, 1), (1, 3, 1), (0, 2, 1), (2, 3, 1)]
+        for algorithm, expected in [
+            (max_flow, {"phases": 1, "augmentations": 2}),
+            (edmonds_karp, {"augmentations": 2}),
+            (ford_fulkerson, {"augmentations": 2}),
+        ]:
+            counts = {}
+            self.assertEqual(algorithm(4, edges, 0, 3, counts)[0], 2)
+            self.assertEqual(counts, expected)
+
+    def test_deep_graph(self):
+        n = 5000
+        edges = [(i, i + 1, 3) for i in range(n - 1)]
+        self.assertEqual(max_flow(n, edges, 0, n - 1)[0], 3)
+
+
+class FlowTreeTests(unittest.TestCase):
+    def test_is_symmetric(self):
+        self.assertTrue(is_symmetric(3, [(0, 1, 2), (1, 0, 1), (1, 0, 1), (2, 2, 5)]))
+        self.assertFalse(is_symmetric(2, [(0, 1, 2)]))
+
+    def test_tree_against_brute_force(self):
+        rng = random.Random(1)
+        for _ in range(50):
+            n = rng.randint(2, 7)
+            edges = random_graph(rng, n, rng.randint(0, 10), symmetric=True)
+            values = tree_values(*flow_tree(n, edges))
+            for s, t in itertools.permutations(range(n), 2):
+                self.assertEqual(values[s][t], brute_force(n, edges, s, t))
+
+    def test_all_pairs_calls(self):
+        rng = random.Random(2)
+        edges = random_graph(rng, 6, 10, symmetric=True)
+        values, calls = all_pairs(6, edges)
+        self.assertEqual(calls, 5)
+        directed = [(0, 1, 3), (1, 2, 2)]
+        values, calls = all_pairs(3, directed)
+        self.assertEqual(calls, 6)
+        self.assertEqual(values[0][2], 2)
+        self.assertEqual(values[2][0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
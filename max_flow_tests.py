@@ -1,12 +1,36 @@
+import os
 import unittest
+import artifacts
 from utils import Graph, SiteManager
 
 
 class MaxFlowCalculatorTests(unittest.TestCase):
+    # scheduler.py sets this to run a whole shard on one browser session
+    shared_site_manager = None
+
     def setUp(self):
-        self.site_manager = SiteManager("https://visualgo.net/en/maxflow")
+        if self.shared_site_manager is not None:
+            self.site_manager = self.shared_site_manager
+            self.site_manager.step_times = []
+            self.site_manager.retries = []
+            self.site_manager.graph_str = ""
+            return
+        # SITE_ARCHIVE replays a page archive recorded with page_archive.py, the
+        # learned wait timeouts are kept in SITE_LATENCIES and SITE_DRIVER is a
+        # WebDriver endpoint such as driver_pool.py to take the browser from
+        self.site_manager = SiteManager(
+            "https://visualgo.net/en/maxflow",
+            replay=os.environ.get("SITE_ARCHIVE"),
+            latency_path=os.environ.get("SITE_LATENCIES", "latencies.json"),
+            remote=os.environ.get("SITE_DRIVER"),
+        )
         self.site_manager.close_instructions()
 
+    # a shared session's latencies are saved by scheduler.py when the shard is done
+    def tearDown(self):
+        if self.shared_site_manager is None:
+            self.site_manager.latency.save()
+
     # Test Case #1: A1, B1, C1, D1
     # Input Space Partition: Ford-Fulkerson, well-formed input, 0-2 nodes, connected graph
     # Description: Simple graph with two nodes and valid input to test functionality
@@ -31,15 +55,10 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph))
 
-        draw_msg = self.site_manager.get_draw_error()
-        self.assertTrue("Source and sink is not connected" in draw_msg)
+        self.site_manager.expect_draw_error("Source and sink is not connected")
 
-        try:
-            # algo should not run with this input, err should have been displayed
-            self.site_manager.ford_fulkerson(0, 1)
-            self.fail()
-        except:
-            pass
+        # algo should not run with this input, err should have been displayed
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 1)
 
     # Test Case #3: A1, B1, C2, D1
     # Input Space Partition: Ford-Fulkerson, well-formed input, 3-4 nodes, connected graph
@@ -69,14 +88,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph))
 
-        draw_msg = self.site_manager.get_draw_error()
-        self.assertTrue("Source and sink is not connected" in draw_msg)
+        self.site_manager.expect_draw_error("Source and sink is not connected")
 
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 4)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 4)
 
     # Test Case #5: A1, B1, C3, D1
     # Input Space Partition: Ford-Fulkerson, well-formed input, 5-7 nodes, connected graph
@@ -109,14 +123,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph))
 
-        draw_msg = self.site_manager.get_draw_error()
-        self.assertTrue("Source and sink is not connected" in draw_msg)
+        self.site_manager.expect_draw_error("Source and sink is not connected")
 
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 5)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 5)
 
     # Test Case #7: A1, B1, C4, D1
     # Input Space Partition: Ford-Fulkerson, well-formed input, 8+ nodes, connected graph
@@ -156,14 +165,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph))
 
-        draw_msg = self.site_manager.get_draw_error()
-        self.assertTrue("Source and sink is not connected" in draw_msg)
+        self.site_manager.expect_draw_error("Source and sink is not connected")
 
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 5)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 5)
 
     # Test Case #9: A1, B2, C1, D1
     # Input Space Partition: Ford-Fulkerson, malformed input, 0-2 nodes, connected graph
@@ -179,14 +183,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Invalid v in line 3" in err)
+        self.site_manager.expect_input_error("Invalid v in line 3")
 
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 1)
 
     # Test Case #10: A1, B2, C1, D2
     # Input Space Partition: Ford-Fulkerson, malformed input, 0-2 nodes, disconnected graph
@@ -200,14 +199,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
+        self.site_manager.expect_input_error("Error trying to read line 2")
 
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 1)
 
     # Test Case #11: A1, B2, C2, D1
     # Input Space Partition: Ford-Fulkerson, malformed input, 3-4 nodes, connected graph
@@ -222,13 +216,8 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         self.site_manager.open_graph_input(True)
 
         self.site_manager.set_graph(str(graph), False)
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
-        try:
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 3)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 3)
 
     # Test Case #12: A1, B2, C2, D2
     # Input Space Partition: Ford-Fulkerson, malformed input, 3-4 nodes, disconnected graph
@@ -241,14 +230,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 4)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 2" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 4)
 
     # Test Case #13: A1, B2, C3, D1
     # Input Space Partition: Ford-Fulkerson, malformed input, 5-7 nodes, connected graph
@@ -264,14 +248,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 5)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 3" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 3")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 5)
 
     # Test Case #14: A1, B2, C3, D2
     # Input Space Partition: Ford-Fulkerson, malformed input, 5-7 nodes, disconnected graph
@@ -287,14 +266,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 6)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 3" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 3")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 6)
 
     # Test Case #15: A1, B2, C4, D1
     # Input Space Partition: Ford-Fulkerson, malformed input, 8+ nodes, connected graph
@@ -312,14 +286,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 7)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 6" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 6")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 7)
 
     # Test Case #16: A1, B2, C4, D2
     # Input Space Partition: Ford-Fulkerson, malformed input, 8+ nodes, disconnected graph
@@ -336,14 +305,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_ford_fulkerson(str(graph), 0, 7)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 5" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 5")
+        self.site_manager.expect_algorithm_blocked("fordfulkerson", 0, 7)
 
     # Test Case #17: A2, B1, C1, D1
     # Input Space Partition: Edmonds-Karp, well-formed input, 0-2 nodes, connected graph
@@ -355,13 +319,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         self.site_manager.open_graph_input(True)
         self.site_manager.set_graph(str(graph))
 
-        draw_msg = self.site_manager.get_draw_error()
-        self.assertTrue("Graph cannot be empty" in draw_msg)
+        self.site_manager.expect_draw_error("Graph cannot be empty")
 
-        try:
-            max_flow = self.site_manager.run_edmonds_karp(str(graph), 0, 0)
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 0)
 
     # Test Case #18: A2, B1, C1, D2
     # Input Space Partition: Edmonds-Karp, well-formed input, 0-2 nodes, disconnected graph
@@ -370,13 +330,13 @@ class MaxFlowCalculatorTests(unittest.TestCase):
     def test_ek_wellformed_1node_disconnected(self):
         graph = Graph(1)
 
-        # should not get a max flow result here so check the -1
-        max_flow = self.site_manager.run_edmonds_karp(str(graph), 0, 0, True)
-
-        self.assertEqual(max_flow, -1)
+        self.site_manager.open_graph_input(True)
+        self.site_manager.set_graph(str(graph))
 
-        err = self.site_manager.get_edmonds_karp_error()
-        self.assertTrue("The source vertex is the same as the sink vertex" in err)
+        # should not get a max flow result here
+        self.site_manager.expect_algorithm_blocked(
+            "edmondskarp", 0, 0, "The source vertex is the same as the sink vertex"
+        )
 
     # Test Case #19: A2, B1, C2, D1
     # Input Space Partition: Edmonds-Karp, well-formed input, 3-4 nodes, connected graph
@@ -451,14 +411,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 4)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 4)
 
     # Test Case #23: A2, B1, C4, D1
     # Input Space Partition: Edmonds-Karp, well-formed input, 8+ nodes, connected graph
@@ -501,14 +456,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         graph.add_edge(8, 9, 25)
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 9)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 9)
 
     # Test Case #25: A2, B2, C1, D1
     # Input Space Partition: Edmonds-Karp, malformed input, 0-2 nodes, connected graph
@@ -522,14 +472,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
+        self.site_manager.expect_input_error("Error trying to read line 2")
 
-        try:
-            self.site_manager.run_edmonds_karp(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 1)
 
     # Test Case #26: A2, B2, C1, D2
     # Input Space Partition: Edmonds-Karp, malformed input, 0-2 nodes, disconnected graph
@@ -544,14 +489,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
+        self.site_manager.expect_input_error("Error trying to read line 2")
 
-        try:
-            self.site_manager.run_edmonds_karp(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 1)
 
     # Test Case #27: A2, B2, C2, D1
     # Input Space Partition: Edmonds-Karp, malformed input, 3-4 nodes, connected graph
@@ -566,13 +506,8 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         self.site_manager.open_graph_input(True)
 
         self.site_manager.set_graph(str(graph), False)
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
-        try:
-            self.site_manager.run_edmonds_karp(str(graph), 0, 3)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 3)
 
     # Test Case #28: A2, B2, C2, D2
     # Input Space Partition: Edmonds-Karp, malformed input, 3-4 nodes, disconnected graph
@@ -585,14 +520,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 4)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 2" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 4)
 
     # Test Case #29: A2, B2, C3, D1
     # Input Space Partition: Edmonds-Karp, malformed input, 5-7 nodes, connected graph
@@ -608,14 +538,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 5)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 3" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 3")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 5)
 
     # Test Case #30: A2, B2, C3, D2
     # Input Space Partition: Edmonds-Karp, malformed input, 5-7 nodes, disconnected graph
@@ -632,14 +557,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 6)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 3" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 3")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 6)
 
     # Test Case #31: A2, B2, C4, D1
     # Input Space Partition: Edmonds-Karp, malformed input, 8+ nodes, connected graph
@@ -660,9 +580,7 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         self.site_manager.open_graph_input()
         self.site_manager.set_graph(str(graph), False)
 
-        msg = self.site_manager.get_input_error()
-
-        self.assertTrue("graph must be connected for flows" in msg)
+        self.site_manager.expect_input_error("graph must be connected for flows")
 
     # Test Case #32: A2, B2, C4, D2
     # Input Space Partition: Edmonds-Karp, malformed input, 8+ nodes, disconnected graph
@@ -679,14 +597,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 7)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 5" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 5")
+        self.site_manager.expect_algorithm_blocked("edmondskarp", 0, 7)
 
     # Test Case #33: A3, B1, C1, D1
     # Input Space Partition: Dinic's, well-formed input, 0-2 nodes, connected graph
@@ -711,14 +624,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_edmonds_karp(str(graph), 0, 9)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 9)
 
     # Test Case #35: A3, B1, C2, D1
     # Input Space Partition: Dinic's, well-formed input, 3-4 nodes, connected graph
@@ -745,14 +653,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 3)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 3)
 
     # Test Case #37: A3, B1, C3, D1
     # Input Space Partition: Dinic’s, well-formed input, 5-7 nodes, connected graph
@@ -785,14 +688,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 4)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 4)
 
     # Test Case #39: A3, B1, C4, D1
     # Input Space Partition: Dinic's, well-formed input, 8+ nodes, connected graph
@@ -835,14 +733,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         graph.add_edge(8, 9, 25)
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 9)
-            self.fail()
-        except:
-            err = self.site_manager.get_draw_error()
-            self.assertTrue("Source and sink is not connected" in err)
-            pass
+        self.site_manager.set_graph(str(graph))
+        self.site_manager.expect_draw_error("Source and sink is not connected")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 9)
 
     # Test Case #41: A3, B2, C1, D1
     # Input Space Partition: Dinic's, malformed input, 0-2 nodes, connected graph
@@ -856,14 +749,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
+        self.site_manager.expect_input_error("Error trying to read line 2")
 
-        try:
-            self.site_manager.run_dinics(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 1)
 
     # Test Case #42: A3, B2, C1, D2
     # Input Space Partition: Dinic's, malformed input, 0-2 nodes, disconnected graph
@@ -878,14 +766,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.set_graph(str(graph), False)
 
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
+        self.site_manager.expect_input_error("Error trying to read line 2")
 
-        try:
-            self.site_manager.run_dinics(str(graph), 0, 1)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 1)
 
     # Test Case #43: A3, B2, C2, D1
     # Input Space Partition: Dinic’s, malformed input, 3-4 nodes, connected graph
@@ -900,13 +783,8 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         self.site_manager.open_graph_input(True)
 
         self.site_manager.set_graph(str(graph), False)
-        err = self.site_manager.get_input_error()
-        self.assertTrue("Error trying to read line 2" in err)
-        try:
-            self.site_manager.run_dinics(str(graph), 0, 3)
-            self.fail()
-        except:
-            pass
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 3)
 
     # Test Case #44: A3, B2, C2, D2
     # Input Space Partition: Dinic's, malformed input, 3-4 nodes, disconnected graph
@@ -919,14 +797,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 4)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 2" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 2")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 4)
 
     # Test Case #45: A3, B2, C3, D1
     # Input Space Partition: Dinic's, malformed input, 5-7 nodes, connected graph
@@ -939,13 +812,13 @@ class MaxFlowCalculatorTests(unittest.TestCase):
         graph.add_edge(2, 3, 5)
         graph.add_edge(3, 4, 5)
 
-        try:
-            self.site_manager.run_dinics(str(graph), 0, 5)
-            # expect an exception here - should not get to a result
-            self.fail()
-        except:
-            err = self.site_manager.get_dinics_error()
-            self.assertTrue("The sink vertex does not exist in the graph" in err)
+        self.site_manager.open_graph_input()
+        self.site_manager.set_graph(str(graph))
+
+        # should not get to a result
+        self.site_manager.expect_algorithm_blocked(
+            "dinic", 0, 5, "The sink vertex does not exist in the graph"
+        )
 
     # Test Case #46: A3, B2, C3, D2
     # Input Space Partition: Dinic’s, malformed input, 5-7 nodes, disconnected graph
@@ -961,14 +834,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 6)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 3" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 3")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 6)
 
     # Test Case #47: A3, B2, C4, D1
     # Input Space Partition: Dinic's, malformed input, 8+ nodes, connected graph
@@ -989,14 +857,9 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 7)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 7" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 7")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 7)
 
     # Test Case #48: A3, B2, C4, D2
     # Input Space Partition: Dinic's, malformed input, 8+ nodes, disconnected graph
@@ -1013,15 +876,11 @@ class MaxFlowCalculatorTests(unittest.TestCase):
 
         self.site_manager.open_graph_input(True)
 
-        try:
-            self.site_manager.set_graph(str(graph))
-            self.site_manager.run_dinics(str(graph), 0, 7)
-            self.fail()
-        except:
-            err = self.site_manager.get_input_error()
-            self.assertTrue("Error trying to read line 5" in err)
-            pass
+        self.site_manager.set_graph(str(graph), False)
+        self.site_manager.expect_input_error("Error trying to read line 5")
+        self.site_manager.expect_algorithm_blocked("dinic", 0, 7)
 
 
 if __name__ == "__main__":
-    unittest.main()
+    # failing tests leave their artifacts in SITE_ARTIFACTS
+    unittest.main(testRunner=artifacts.runner_class())
@@ -0,0 +1,113 @@
+import argparse
+import json
+import re
+import sys
+from graph_gen import FAMILIES, generate
+from max_flow import ALGORITHMS as REFERENCE
+from utils import add_site_args, site_from_args
+
+# the page narrates each run in #status. a status message matching one of these
+# patterns counts as one operation of that kind; override them when the site's wording
+# changes
+OPERATION_PATTERNS = {
+    "fordfulkerson": {"augmentations": r"augmenting path"},
+    "edmondskarp": {"augmentations": r"augmenting path"},
+    "dinic": {"phases": r"level graph", "augmentations": r"augmenting path"},
+}
+
+# worst-case operation counts for (vertices, edges, max flow): Ford-Fulkerson with
+# integer capacities augments at most once per unit of flow, Edmonds-Karp at most VE/2
+# times, and Dinic runs fewer than V phases of at most E augmentations each
+BOUNDS = {
+    "fordfulkerson": {"augmentations": lambda v, e, f: f},
+    "edmondskarp": {"augmentations": lambda v, e, f: v * e // 2},
+    "dinic": {
+        "phases": lambda v, e, f: v - 1,
+        "augmentations": lambda v, e, f: (v - 1) * e,
+    },
+}
+
+
+def count_matches(statuses, patterns):
+    return {
+        name: sum(1 for text in statuses if re.search(pattern, text, re.I))
+        for name, pattern in patterns.items()
+    }
+
+
+def reference_counts(algorithm, n, edges, s, t):
+    counts = {}
+    value, _ = REFERENCE[algorithm](n, edges, s, t, counts)
+    return value, counts
+
+
+# Ford-Fulkerson's count depends on which path its dfs happens to take, so only its
+# bound is checked
+ARBITRARY_PATHS = {"fordfulkerson"}
+
+
+# one row per counted quantity: (name, observed, reference, bound, flagged). a count
+# is flagged once it exceeds factor times the reference or the theoretical bound
+def check(algorithm, n, edges, s, t, observed, factor=2.0):
+    value, reference = reference_counts(algorithm, n, edges, s, t)
+    bounds = BOUNDS.get(algorithm, {})
+    rows = []
+    for name, count in sorted(observed.items()):
+        ref = reference.get(name, 0)
+        bound = bounds[name](n, len(edges), value) if name in bounds else None
+        over_ref = algorithm not in ARBITRARY_PATHS and count > factor * max(ref, 1)
+        over_bound = bound is not None and count > factor * max(bound, 1)
+        rows.append((name, count, ref, bound, over_ref or over_bound))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="count the site's augmentations and phases against bounds"
+    )
+    add_site_args(parser, fast=False)
+    parser.add_argument(
+        "--families", nargs="+", default=["layered", "sparse"], choices=FAMILIES
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[4, 8, 12])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--factor", type=float, default=2.0)
+    parser.add_argument(
+        "--patterns", help="json file of {algorithm: {quantity: regex}} to use instead"
+    )
+    args = parser.parse_args()
+
+    patterns = OPERATION_PATTERNS
+    if args.patterns:
+        with open(args.patterns) as f:
+            patterns = json.load(f)
+    site_manager = site_from_args(args)
+    # counting needs the whole playback, which is only quick without animations
+    site_manager.set_fast_mode()
+    flagged = 0
+    for family in args.families:
+        for n in args.sizes:
+            graph = generate(family, n, args.seed)
+            s, t = 0, graph.n - 1
+            for algorithm in args.algorithms:
+                observed = site_manager.count_operations(
+                    algorithm, str(graph), s, t, patterns.get(algorithm, {})
+                )
+                if observed is None:
+                    print(f"{algorithm} {family}/{graph.n}: did not finish")
+                    continue
+                rows = check(
+                    algorithm, graph.n, graph.edges, s, t, observed, args.factor
+                )
+                for name, count, ref, bound, flag in rows:
+                    flagged += flag
+                    print(
+                        f"{'FLAG' if flag else 'ok':>4} {algorithm} {family}/{graph.n} "
+                        f"{name}: {count} (reference {ref}, bound {bound})"
+                    )
+    print(f"{flagged} flagged")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
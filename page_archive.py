@@ -0,0 +1,240 @@
+import argparse
+import base64
+import fnmatch
+import hashlib
+import json
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# an archive is a zip with index.json and one file per recorded response. replay serves
+# the site's own origin at the server root and every other recorded origin under
+# /__origin__/<scheme>/<host>/, rewriting absolute urls in text responses to match
+
+TRACKERS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*adservice.google.com*",
+    "*facebook.net*",
+    "*facebook.com/tr*",
+    "*hotjar.com*",
+    "*clarity.ms*",
+]
+
+# in replay nothing may leave the machine: the server is plain http, so this blocks the
+# live site and every other https origin along with the trackers
+REPLAY_BLOCKED = ["https://*", "wss://*"] + TRACKERS
+
+TEXT_TYPES = ("text/", "javascript", "json", "xml", "css")
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def is_tracker(url):
+    return any(fnmatch.fnmatch(url, pattern) for pattern in TRACKERS)
+
+
+def _origin(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _responses(driver):
+    responses = {}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        if message["method"] == "Network.responseReceived":
+            params = message["params"]
+            responses[params["requestId"]] = params["response"]
+    return responses
+
+
+def record(url, path, settle=5):
+    from selenium import webdriver
+    from selenium.common.exceptions import WebDriverException
+    from utils import wait_idle
+
+    options = webdriver.ChromeOptions()
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": TRACKERS})
+        driver.get(url)
+        wait_idle(driver)
+        # scripts and fonts that load after the page settles
+        time.sleep(settle)
+        entries = {}
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for request_id, response in _responses(driver).items():
+                if is_tracker(response["url"]) or response["url"].startswith("data:"):
+                    continue
+                try:
+                    body = driver.execute_cdp_cmd(
+                        "Network.getResponseBody", {"requestId": request_id}
+                    )
+                except WebDriverException:
+                    continue
+                data = body["body"].encode()
+                if body["base64Encoded"]:
+                    data = base64.b64decode(data)
+                name = f"bodies/{len(entries)}"
+                archive.writestr(name, data)
+                entries[response["url"]] = {
+                    # a revalidated 304 still hands back the cached body
+                    "status": 200 if response["status"] == 304 else response["status"],
+                    "mime": response.get("mimeType", "application/octet-stream"),
+                    "file": name,
+                }
+            if url not in entries:
+                raise ArchiveError(f"the page itself was not captured from {url}")
+            document = archive.read(entries[url]["file"])
+            index = {
+                "url": url,
+                "recorded": time.time(),
+                "version": hashlib.sha256(document).hexdigest()[:16],
+                "entries": entries,
+            }
+            archive.writestr("index.json", json.dumps(index, indent=1))
+        return index
+    finally:
+        driver.quit()
+
+
+def read_index(path):
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read("index.json"))
+
+
+class ReplayServer:
+    # version pins the archive: replay refuses an archive of a different site version
+    def __init__(self, path, version=None, port=0):
+        self.archive = zipfile.ZipFile(path)
+        self.index = json.loads(self.archive.read("index.json"))
+        if version and self.index["version"] != version:
+            raise ArchiveError(
+                f"{path} holds site version {self.index['version']}, expected {version}"
+            )
+        self.site = _origin(self.index["url"])
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.rewrites = self._rewrites()
+
+    def _rewrites(self):
+        site_host = self.site.split("://")[1]
+        pairs = [(self.site, self.base), (f"//{site_host}", self.base[5:])]
+        for origin in {_origin(url) for url in self.index["entries"]} - {self.site}:
+            scheme, host = origin.split("://")
+            local = f"{self.base}/__origin__/{scheme}/{host}"
+            pairs += [(origin, local), (f"//{host}", local[5:])]
+        return [(a.encode(), b.encode()) for a, b in pairs]
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.archive.close()
+
+    # the local address of a url on the recorded site
+    def local_url(self, url):
+        if not url.startswith(self.site):
+            raise ArchiveError(f"{url} is not on the recorded site {self.site}")
+        return self.base + url[len(self.site) :]
+
+    def original_url(self, path):
+        if path.startswith("/__origin__/"):
+            scheme, host, rest = (path[len("/__origin__/") :].split("/", 2) + [""])[:3]
+            return f"{scheme}://{host}/{rest}"
+        return self.site + path
+
+    def lookup(self, path):
+        url = self.original_url(path)
+        entries = self.index["entries"]
+        entry = entries.get(url) or entries.get(url.split("?", 1)[0])
+        if entry is None:
+            return url, None, None
+        data = self.archive.read(entry["file"])
+        if any(t in entry["mime"] for t in TEXT_TYPES):
+            for a, b in self.rewrites:
+                data = data.replace(a, b)
+        return url, entry, data
+
+    def _handler(self):
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with replay.lock:
+                    url, entry, data = replay.lookup(self.path)
+                    if entry is None:
+                        replay.misses.append(url)
+                    else:
+                        replay.hits += 1
+                if entry is None:
+                    self.send_error(404)
+                    return
+                self.send_response(entry["status"])
+                self.send_header("Content-Type", entry["mime"])
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("Cache-Control", "max-age=86400")
+                self.end_headers()
+                self.wfile.write(data)
+
+            # beacons and form posts go nowhere
+            def do_POST(self):
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="record and replay the site's assets")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="capture the page's responses into an archive")
+    rec.add_argument("out")
+    rec.add_argument("--url", default="https://visualgo.net/en/maxflow")
+    rec.add_argument("--settle", type=float, default=5)
+    info = sub.add_parser("info", help="show what an archive holds")
+    info.add_argument("archive")
+    serve = sub.add_parser("serve", help="serve an archive for manual browsing")
+    serve.add_argument("archive")
+    serve.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        index = record(args.url, args.out, args.settle)
+        print(f"recorded {len(index['entries'])} responses, version {index['version']}")
+    elif args.command == "info":
+        index = read_index(args.archive)
+        recorded = time.ctime(index["recorded"])
+        print(f"{index['url']} version {index['version']}, recorded {recorded}")
+        for url, entry in sorted(index["entries"].items()):
+            print(f"  {entry['status']} {entry['mime']:<24} {url}")
+    else:
+        server = ReplayServer(args.archive, port=args.port).start()
+        print(f"serving {server.local_url(server.index['url'])}")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
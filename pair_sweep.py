@@ -0,0 +1,68 @@
+import argparse
+import json
+import time
+from graph_gen import FAMILIES, generate, symmetrize
+from max_flow import all_pairs
+from utils import add_site_args, site_from_args
+
+# every ordered (s, t) pair of one drawn graph against local expected values. the site
+# refuses some endpoints outright with an error under the panel; those are counted as
+# blocked, and any other -1 is a mismatch
+
+
+# yields one record per pair whose max flow differs from the expected value
+def sweep(site_manager, algorithm, graph, expected, counts):
+    pairs = [(s, t) for s in range(graph.n) for t in range(graph.n) if s != t]
+    for s, t, actual in site_manager.sweep_pairs(algorithm, str(graph), pairs):
+        want = expected[s][t]
+        counts["runs"] += 1
+        if actual == want:
+            continue
+        # -1 is also what a run that never finished returns, so only a shown error
+        # makes it a refusal
+        if actual == -1 and site_manager.get_algorithm_error(algorithm):
+            counts["blocked"] += 1
+            continue
+        counts["mismatches"] += 1
+        yield {"algorithm": algorithm, "s": s, "t": t, "expected": want, "got": actual}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="run every source/sink pair of one graph against expected values"
+    )
+    add_site_args(parser)
+    parser.add_argument("--family", default="sparse", choices=FAMILIES)
+    parser.add_argument("--n", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--directed",
+        action="store_true",
+        help="keep the edges one-way; expected values then need one oracle call "
+        "per pair instead of n - 1",
+    )
+    args = parser.parse_args()
+
+    graph = generate(args.family, args.n, args.seed)
+    if not args.directed:
+        graph = symmetrize(graph)
+    start = time.perf_counter()
+    expected, calls = all_pairs(graph.n, graph.edges)
+    oracle = time.perf_counter() - start
+    print(f"expected values from {calls} oracle calls in {oracle:.2f}s")
+
+    site_manager = site_from_args(args)
+    for algorithm in args.algorithms:
+        counts = {"runs": 0, "blocked": 0, "mismatches": 0}
+        start = time.perf_counter()
+        for mismatch in sweep(site_manager, algorithm, graph, expected, counts):
+            print(json.dumps(mismatch), flush=True)
+        seconds = time.perf_counter() - start
+        print(
+            f"{algorithm}: {counts['runs']} pairs in {seconds:.1f}s, "
+            f"{counts['mismatches']} mismatches, {counts['blocked']} blocked"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import argparse
+import math
+import statistics
+from graph_gen import FAMILIES, generate
+from history import History
+from utils import add_site_args, site_from_args
+
+# candidate complexity classes for the fitted estimate
+MODELS = {
+    "E": lambda v, e: e,
+    "E log V": lambda v, e: e * math.log2(max(v, 2)),
+    "V^2": lambda v, e: v * v,
+    "VE": lambda v, e: v * e,
+    "E^2": lambda v, e: e * e,
+    "V^2 E": lambda v, e: v * v * e,
+    "VE^2": lambda v, e: v * e * e,
+}
+
+# browser timers are clamped to a coarse resolution, keep the logs finite
+MIN_MS = 1e-3
+
+
+# record(algorithm, family, graph, ms, steps, metrics) is called for every single
+# measurement, with the heap metrics sampled after it if the site manager collects them
+def sweep(site_manager, algorithms, families, sizes, repeat=3, seed=0, record=None):
+    curves = {}
+    for family in families:
+        for n in sizes:
+            graph = generate(family, n, seed)
+            graph_str = str(graph)
+            for algorithm in algorithms:
+                times = []
+                for _ in range(repeat):
+                    mark = len(site_manager.step_times)
+                    samples = len(site_manager.metric_samples)
+                    site_manager.run(algorithm, graph_str, 0, graph.n - 1)
+                    ms = site_manager.algorithm_time(algorithm)
+                    if ms is None:
+                        continue
+                    times.append(max(ms, MIN_MS))
+                    if record is not None:
+                        steps = site_manager.step_times[mark:]
+                        metrics = {}
+                        if len(site_manager.metric_samples) > samples:
+                            metrics = site_manager.metric_samples[-1]["metrics"]
+                        record(algorithm, family, graph, ms, steps, metrics)
+                if times:
+                    point = (graph.n, len(graph.edges), statistics.median(times))
+                    curves.setdefault((algorithm, family), []).append(point)
+    return curves
+
+
+# least squares in log space of t = c * f(V, E) for each candidate model
+def fit_complexity(points):
+    fits = []
+    for name, f in MODELS.items():
+        logs = [math.log(t) - math.log(max(f(v, e), 1)) for v, e, t in points]
+        c = statistics.fmean(logs)
+        rms = math.sqrt(statistics.fmean((x - c) ** 2 for x in logs))
+        fits.append((rms, name, math.exp(c)))
+    rms, name, c = min(fits)
+    return name, c, rms
+
+
+# exponent b of t ~ x^b
+def exponent(xs, ts):
+    if len(set(xs)) < 2:
+        return float("nan")
+    slope, _ = statistics.linear_regression(
+        [math.log(x) for x in xs], [math.log(t) for t in ts]
+    )
+    return slope
+
+
+def report(curves):
+    lines = []
+    for (algorithm, family), points in sorted(curves.items()):
+        lines.append(f"{algorithm} / {family}")
+        lines.append(f"  {'V':>6} {'E':>8} {'ms':>10}")
+        for v, e, t in points:
+            lines.append(f"  {v:>6} {e:>8} {t:>10.3f}")
+        if len(points) >= 2:
+            vs, es, ts = zip(*points)
+            name, c, rms = fit_complexity(points)
+            lines.append(
+                f"  t ~ V^{exponent(vs, ts):.2f}, t ~ E^{exponent(es, ts):.2f}, "
+                f"best fit O({name}) with c={c:.3g} ms (log rms {rms:.2f})"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="measure how the site's algorithms scale"
+    )
+    add_site_args(parser)
+    parser.add_argument(
+        "--families", nargs="+", default=["layered", "sparse"], choices=FAMILIES
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=[4, 8, 16, 32])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", help="store the measurements in this database")
+    args = parser.parse_args()
+
+    # stored measurements carry the heap metrics sampled after each run
+    site_manager = site_from_args(args, collect_metrics=bool(args.history))
+    site_manager.enable_timing()
+    record = None
+    if args.history:
+        history = History(args.history)
+        run_id = history.start_run("scaling", site_manager.browser_version())
+
+        def record(algorithm, family, graph, ms, steps, metrics):
+            n, m = graph.n, len(graph.edges)
+            name = f"{algorithm}/{family}/{n}"
+            history.add_result(
+                run_id, name, algorithm, n, m, "pass", ms / 1000, steps, (), metrics
+            )
+
+    curves = sweep(
+        site_manager,
+        args.algorithms,
+        args.families,
+        args.sizes,
+        args.repeat,
+        args.seed,
+        record,
+    )
+    print(report(curves))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import math
+import unittest
+from scaling import MODELS, exponent, fit_complexity, report
+
+# sparse and dense graphs of each size, so V and E do not grow together
+SIZES = [(v, e) for v in (8, 16, 32, 64, 128) for e in (2 * v, v * v // 4)]
+
+
+def curve(model, c=0.01, noise=()):
+    points = []
+    for i, (v, e) in enumerate(SIZES):
+        wobble = noise[i % len(noise)] if noise else 1.0
+        points.append((v, e, c * MODELS[model](v, e) * wobble))
+    return points
+
+
+class FitComplexityTests(unittest.TestCase):
+    def test_every_model_fits_itself(self):
+        for model in MODELS:
+            name, c, rms = fit_complexity(curve(model))
+            self.assertEqual(name, model)
+            self.assertAlmostEqual(c, 0.01)
+            self.assertAlmostEqual(rms, 0.0)
+
+    def test_ve(self):
+        self.assertEqual(fit_complexity(curve("VE", 0.3))[0], "VE")
+
+    def test_v2e(self):
+        self.assertEqual(fit_complexity(curve("V^2 E", 2e-4))[0], "V^2 E")
+
+    def test_noise(self):
+        noise = (1.2, 0.85, 1.1, 0.9, 1.05)
+        self.assertEqual(fit_complexity(curve("VE", noise=noise))[0], "VE")
+        self.assertEqual(fit_complexity(curve("V^2 E", noise=noise))[0], "V^2 E")
+
+
+class ExponentTests(unittest.TestCase):
+    def test_power_law(self):
+        xs = [8, 16, 32, 64]
+        self.assertAlmostEqual(exponent(xs, [0.5 * x**2 for x in xs]), 2.0)
+        self.assertAlmostEqual(exponent(xs, [3 * x**1.5 for x in xs]), 1.5)
+
+    def test_one_size(self):
+        self.assertTrue(math.isnan(exponent([8, 8], [1.0, 2.0])))
+
+
+class ReportTests(unittest.TestCase):
+    def test_fit_line(self):
+        text = report({("dinic", "dense"): curve("VE")})
+        self.assertIn("dinic / dense", text)
+        self.assertIn("best fit O(VE) with c=0.01 ms (log rms 0.00)", text)
+
+    def test_single_point_has_no_fit(self):
+        text = report({("dinic", "dense"): curve("VE")[:1]})
+        self.assertNotIn("best fit", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,344 @@
+import argparse
+import ast
+import collections
+import inspect
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+import unittest
+import artifacts
+import live_report
+from history import DB, History, flatten, result_class
+
+# what a test needs from the page. mode is the graph input type it opens first and
+# end_mode the one it leaves selected: "flow" clicks Flow, "default" leaves the type
+# alone, None never opens the input. dirty tests leave the input open with an error
+Profile = collections.namedtuple(
+    "Profile", ["id", "name", "mode", "end_mode", "dirty", "duration"]
+)
+
+# seconds for a new browser session and for a page reload between two tests
+SESSION_COST = 3.0
+RESET_COST = 1.5
+# for tests without history
+DEFAULT_DURATION = 10.0
+
+# graph input calls -> position and name of their default flag
+INPUT_CALLS = {
+    "open_graph_input": (0, "default"),
+    "run": (4, "default_graph"),
+    "run_ford_fulkerson": (3, "default_graph"),
+    "run_edmonds_karp": (3, "default_graph"),
+    "run_dinics": (3, "default_graph"),
+    "verify_fast_mode": (4, "default_graph"),
+}
+
+
+def _arg(call, index, keyword, default):
+    node = call.args[index] if len(call.args) > index else None
+    for kw in call.keywords:
+        if kw.arg == keyword:
+            node = kw.value
+    if isinstance(node, ast.Constant):
+        return node.value
+    return default
+
+
+def profile_test(test, durations):
+    method = getattr(test, test._testMethodName)
+    tree = ast.parse(textwrap.dedent(inspect.getsource(method)))
+    calls = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+    ]
+    modes = []
+    dirty = False
+    for call in sorted(calls, key=lambda c: (c.lineno, c.col_offset)):
+        name = call.func.attr
+        if name in INPUT_CALLS:
+            default = _arg(call, *INPUT_CALLS[name], False)
+            modes.append("default" if default else "flow")
+        elif name == "set_graph":
+            dirty = dirty or _arg(call, 1, "click_done", True) is False
+    short = test.id().split(".")[-1]
+    duration = durations.get(short)
+    if duration is None:
+        duration = statistics.median(durations.values()) if durations else None
+    return Profile(
+        test.id(),
+        short,
+        modes[0] if modes else None,
+        modes[-1] if modes else None,
+        dirty,
+        DEFAULT_DURATION if duration is None else duration,
+    )
+
+
+def load_tests(module):
+    return flatten(unittest.TestLoader().loadTestsFromName(module))
+
+
+# median passing duration per test over the latest suite runs
+def load_durations(path, runs=20):
+    if not path or not os.path.exists(path):
+        return {}
+    history = History(path)
+    samples = history.samples(history.recent_runs("suite", runs))
+    return {
+        name: statistics.median(values)
+        for (name, step), values in samples.items()
+        if step == "total"
+    }
+
+
+# a page that had Flow selected cannot go back to the default type without a reload,
+# and one left with an open input error is reloaded before anything else runs on it
+def needs_reset(previous, current):
+    if current is None:
+        return True
+    return previous.dirty or (previous.end_mode == "flow" and current.mode == "default")
+
+
+# default-type tests first so the type only ever moves towards Flow, and within a type
+# the tests that need a reload after them last
+def order(profiles):
+    return sorted(profiles, key=lambda p: (p.mode == "flow", p.dirty, p.name))
+
+
+def resets(profiles):
+    return sum(needs_reset(a, b) for a, b in zip(profiles, profiles[1:]))
+
+
+def shard_cost(profiles, session_cost=SESSION_COST, reset_cost=RESET_COST):
+    if not profiles:
+        return 0.0
+    work = sum(p.duration for p in profiles)
+    return session_cost + work + reset_cost * resets(order(profiles))
+
+
+# longest processing time first: each test, longest first, goes to the shard it
+# leaves with the smallest cost, resets included
+def plan(profiles, workers, session_cost=SESSION_COST, reset_cost=RESET_COST):
+    shards = [[] for _ in range(workers)]
+    for p in sorted(profiles, key=lambda p: (-p.duration, p.name)):
+        best = min(
+            shards, key=lambda s: shard_cost(s + [p], session_cost, reset_cost)
+        )
+        best.append(p)
+    return [order(s) for s in shards if s]
+
+
+# no schedule beats its longest test, an even split of the work, or an even split of
+# the reloads every dirty test but the last one per shard forces
+def lower_bound(profiles, workers, session_cost=SESSION_COST, reset_cost=RESET_COST):
+    if not profiles:
+        return 0.0
+    workers = min(workers, len(profiles))
+    dirty = sum(p.dirty for p in profiles)
+    work = sum(p.duration for p in profiles) + reset_cost * max(0, dirty - workers)
+    longest = max(p.duration for p in profiles)
+    return session_cost + max(longest, work / workers)
+
+
+def report(shards, bound, session_cost=SESSION_COST, reset_cost=RESET_COST):
+    costs = [shard_cost(s, session_cost, reset_cost) for s in shards]
+    lines = []
+    for i, (shard, cost) in enumerate(zip(shards, costs)):
+        modes = collections.Counter(p.mode for p in shard)
+        kinds = ", ".join(f"{c} {m}" for m, c in sorted(modes.items(), key=str))
+        lines.append(
+            f"shard {i}: {len(shard)} tests ({kinds}), {resets(shard)} resets, "
+            f"{cost:.1f}s"
+        )
+    makespan = max(costs, default=0.0)
+    ratio = makespan / bound if bound else 1.0
+    lines.append(
+        f"planned makespan {makespan:.1f}s, lower bound {bound:.1f}s ({ratio:.2f}x)"
+    )
+    return "\n".join(lines)
+
+
+def shard_result_class(base, profiles, site_manager):
+    class ShardResult(base):
+        previous = None
+
+        def startTest(self, test):
+            current = profiles.get(test.id())
+            if self.previous is not None and needs_reset(self.previous, current):
+                site_manager.recycle_pending = True
+            super().startTest(test)
+
+        def stopTest(self, test):
+            super().stopTest(test)
+            self.previous = profiles.get(test.id())
+
+        # the page is in an unknown state after a failure
+        def addFailure(self, test, err):
+            super().addFailure(test, err)
+            site_manager.recycle_pending = True
+
+        def addError(self, test, err):
+            super().addError(test, err)
+            site_manager.recycle_pending = True
+
+    return ShardResult
+
+
+# runs the given tests in order on one shared browser session
+def run_shard(module, test_ids, db=None, run_id=None, stream=None, junit=None):
+    from utils import URL, SiteManager
+
+    tests = unittest.TestLoader().loadTestsFromNames(test_ids)
+    profiles = {t.id(): profile_test(t, {}) for t in load_tests(module)}
+    site_manager = SiteManager(
+        URL,
+        replay=os.environ.get("SITE_ARCHIVE"),
+        latency_path=os.environ.get("SITE_LATENCIES", "latencies.json"),
+        remote=os.environ.get("SITE_DRIVER"),
+    )
+    site_manager.close_instructions()
+    for test in tests:
+        type(test).shared_site_manager = site_manager
+    base = unittest.TextTestResult
+    if db:
+        base = result_class(History(db), run_id)
+    base = artifacts.result_class(None, base)
+    resultclass = shard_result_class(base, profiles, site_manager)
+    reporter = None
+    if stream or junit:
+        reporter = live_report.Reporter(stream, junit)
+        resultclass = live_report.result_class(reporter, resultclass)
+    result = unittest.TextTestRunner(resultclass=resultclass).run(tests)
+    if reporter:
+        reporter.close()
+    site_manager.latency.save()
+    print(f"{len(test_ids)} tests, {site_manager.recycles} resets")
+    return result.wasSuccessful()
+
+
+# "junit.xml" -> "junit-shard0.xml"
+def shard_path(path, worker):
+    root, ext = os.path.splitext(path)
+    return f"{root}-{worker}{ext}"
+
+
+# runs every shard in its own process and records the makespan against the bound.
+# shards append to one json lines stream, write a junit file each, and with dashboard
+# this process follows the stream until they are done
+def run(
+    shards, bound, module, db=None, label=None, stream=None, junit=None, dashboard=False
+):
+    history = History(db) if db else None
+    suite_id = history.start_run("suite", label=label) if history else None
+    if dashboard and not stream:
+        stream = os.path.join(tempfile.mkdtemp(), "results.jsonl")
+    offset = os.path.getsize(stream) if stream and os.path.exists(stream) else 0
+    # under the dashboard the shards' output goes to logs shown once they are done
+    logs = []
+    start = time.perf_counter()
+    procs = []
+    for i, shard in enumerate(shards):
+        worker = f"shard{i}"
+        cmd = [sys.executable, os.path.abspath(__file__), "shard", "--module", module]
+        if db:
+            cmd += ["--db", db, "--run-id", str(suite_id)]
+        if stream:
+            cmd += ["--stream", stream]
+        if junit:
+            cmd += ["--junit", shard_path(junit, worker)]
+        env = {**os.environ, "SITE_WORKER": worker}
+        out = None
+        if dashboard:
+            out = tempfile.TemporaryFile("w+")
+            logs.append((worker, out))
+        procs.append(
+            subprocess.Popen(
+                cmd + [p.id for p in shard], env=env, stdout=out, stderr=out
+            )
+        )
+    if dashboard:
+
+        def done():
+            return all(proc.poll() is not None for proc in procs)
+
+        board = live_report.Dashboard(sys.stdout)
+        for r in live_report.follow(stream, done, offset):
+            board.add(r)
+        board.draw()
+    ok = all([proc.wait() == 0 for proc in procs])
+    for worker, out in logs:
+        out.seek(0)
+        print(f"--- {worker}")
+        print(out.read(), end="")
+        out.close()
+    makespan = time.perf_counter() - start
+    ratio = makespan / bound if bound else 1.0
+    print(f"makespan {makespan:.1f}s, lower bound {bound:.1f}s ({ratio:.2f}x)")
+    if history:
+        run_id = history.start_run("schedule", label=label)
+        outcome = "pass" if ok else "fail"
+        history.add_result(run_id, "makespan", None, None, None, outcome, makespan)
+        history.add_result(run_id, "lower_bound", None, None, None, "bound", bound)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="shard the browser tests by duration and shared page state"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, text in [("plan", "print the schedule"), ("run", "run the schedule")]:
+        cmd = sub.add_parser(name, help=text)
+        cmd.add_argument("--module", default="max_flow_tests")
+        cmd.add_argument("--workers", type=int, default=4)
+        cmd.add_argument("--db", default=DB, help="history database with durations")
+        cmd.add_argument("--session-cost", type=float, default=SESSION_COST)
+        cmd.add_argument("--reset-cost", type=float, default=RESET_COST)
+        cmd.add_argument("--label")
+        cmd.add_argument("--stream", help="append a json line per test here")
+        cmd.add_argument("--junit", help="junit xml, one file per shard")
+        cmd.add_argument("--dashboard", action="store_true", help="live progress")
+    shard = sub.add_parser("shard", help="run tests in order on one session")
+    shard.add_argument("tests", nargs="+")
+    shard.add_argument("--module", default="max_flow_tests")
+    shard.add_argument("--db")
+    shard.add_argument("--run-id", type=int)
+    shard.add_argument("--stream")
+    shard.add_argument("--junit")
+    args = parser.parse_args()
+    if getattr(args, "stream", None) == "-":
+        parser.error("shards share the stream through a file, --stream - is not one")
+
+    if args.command == "shard":
+        ok = run_shard(
+            args.module, args.tests, args.db, args.run_id, args.stream, args.junit
+        )
+        sys.exit(0 if ok else 1)
+
+    durations = load_durations(args.db)
+    profiles = [profile_test(t, durations) for t in load_tests(args.module)]
+    costs = (args.session_cost, args.reset_cost)
+    shards = plan(profiles, args.workers, *costs)
+    bound = lower_bound(profiles, args.workers, *costs)
+    print(report(shards, bound, *costs))
+    if args.command == "run":
+        ok = run(
+            shards,
+            bound,
+            args.module,
+            args.db,
+            args.label,
+            args.stream,
+            args.junit,
+            args.dashboard,
+        )
+        sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import random
+import unittest
+from scheduler import (
+    Profile,
+    lower_bound,
+    needs_reset,
+    order,
+    plan,
+    profile_test,
+    resets,
+    shard_cost,
+)
+
+
+def profile(name, mode="flow", end_mode=None, dirty=False, duration=1.0):
+    return Profile(name, name, mode, end_mode or mode, dirty, duration)
+
+
+# bodies for profile_test to read; never run, so not named test_*
+class Cases(unittest.TestCase):
+    def case_default_then_flow(self):
+        self.site_manager.open_graph_input(True)
+        self.site_manager.set_graph("2 1\n0 1 5\n")
+        self.site_manager.run_dinics("2 1\n0 1 5\n", 0, 1)
+
+    def case_keyword_default(self):
+        self.site_manager.run("dinic", "2 1\n0 1 5\n", 0, 1, default_graph=True)
+
+    def case_open_input_error(self):
+        self.site_manager.open_graph_input()
+        self.site_manager.set_graph("2 1\n0 x 5\n", False)
+
+    def case_set_graph_only(self):
+        self.site_manager.set_graph("2 1\n0 x 5\n", click_done=False)
+
+
+class ProfileTests(unittest.TestCase):
+    def profile(self, name, durations=None):
+        return profile_test(Cases(name), durations or {})
+
+    def test_modes_in_call_order(self):
+        p = self.profile("case_default_then_flow", {"case_default_then_flow": 4.0})
+        self.assertEqual((p.mode, p.end_mode, p.dirty), ("default", "flow", False))
+        self.assertEqual(p.duration, 4.0)
+
+    def test_keyword_flag(self):
+        p = self.profile("case_keyword_default")
+        self.assertEqual((p.mode, p.end_mode), ("default", "default"))
+
+    def test_input_left_open(self):
+        p = self.profile("case_open_input_error")
+        self.assertEqual((p.mode, p.end_mode, p.dirty), ("flow", "flow", True))
+
+    def test_set_graph_without_opening_input(self):
+        p = self.profile("case_set_graph_only")
+        self.assertEqual((p.mode, p.end_mode, p.dirty), (None, None, True))
+
+    def test_duration_defaults(self):
+        p = self.profile("case_keyword_default", {"other": 2.0, "another": 4.0})
+        self.assertEqual(p.duration, 3.0)
+        self.assertEqual(self.profile("case_keyword_default").duration, 10.0)
+
+
+class ResetTests(unittest.TestCase):
+    def test_needs_reset(self):
+        default, flow = profile("d", "default"), profile("f", "flow")
+        self.assertFalse(needs_reset(default, flow))
+        self.assertTrue(needs_reset(flow, default))
+        self.assertFalse(needs_reset(flow, flow))
+        self.assertTrue(needs_reset(profile("x", dirty=True), flow))
+        # an unprofiled test gets a fresh page
+        self.assertTrue(needs_reset(flow, None))
+
+    def test_mode_transitions(self):
+        d1, d2 = profile("d1", "default"), profile("d2", "default")
+        f1, f2 = profile("f1", "flow"), profile("f2", "flow")
+        dirty = profile("x", "flow", dirty=True)
+        self.assertEqual(resets([f1, d1, f2, d2]), 2)
+        self.assertEqual(resets([d1, dirty, f1, d2]), 2)
+        self.assertEqual(resets(order([f1, d1, f2, d2])), 0)
+        self.assertEqual(resets(order([dirty, f1, d1, d2])), 0)
+
+    def test_order(self):
+        profiles = [profile("b"), profile("x", dirty=True), profile("a", "default")]
+        self.assertEqual([p.name for p in order(profiles)], ["a", "b", "x"])
+
+    def test_shard_cost(self):
+        shard = [profile("f", "flow", duration=2.0), profile("d", "default")]
+        self.assertEqual(shard_cost(shard, 3.0, 1.5), 3.0 + 3.0)
+        shard.append(profile("x", dirty=True, duration=1.0))
+        shard.append(profile("y", dirty=True, duration=1.0))
+        self.assertEqual(shard_cost(shard, 3.0, 1.5), 3.0 + 5.0 + 1.5)
+        self.assertEqual(shard_cost([]), 0.0)
+
+
+class PlanTests(unittest.TestCase):
+    def test_every_test_once(self):
+        profiles = [profile(f"t{i}", duration=i + 1.0) for i in range(10)]
+        shards = plan(profiles, 3)
+        names = sorted(p.name for shard in shards for p in shard)
+        self.assertEqual(names, sorted(p.name for p in profiles))
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(len(plan(profiles[:2], 5)), 2)
+
+    def test_balance_against_lower_bound(self):
+        rng = random.Random(0)
+        for workers in (2, 3, 4, 8):
+            profiles = [
+                profile(
+                    f"t{i}",
+                    rng.choice(["default", "flow"]),
+                    dirty=rng.random() < 0.3,
+                    duration=rng.uniform(1, 20),
+                )
+                for i in range(40)
+            ]
+            bound = lower_bound(profiles, workers)
+            makespan = max(shard_cost(s) for s in plan(profiles, workers))
+            self.assertGreaterEqual(makespan, bound - 1e-9)
+            # longest processing time first stays within 4/3 of optimal
+            self.assertLessEqual(makespan, bound * 4 / 3)
+
+    def test_one_long_test(self):
+        profiles = [profile("long", duration=50.0)] + [
+            profile(f"t{i}") for i in range(10)
+        ]
+        bound = lower_bound(profiles, 4, session_cost=0.0)
+        self.assertEqual(bound, 50.0)
+        shards = plan(profiles, 4, session_cost=0.0)
+        self.assertEqual([p.name for p in shards[0]], ["long"])
+
+    def test_empty(self):
+        self.assertEqual(plan([], 3), [])
+        self.assertEqual(lower_bound([], 3), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import ast
+import hashlib
+import inspect
+import re
+import textwrap
+import unittest
+import zipfile
+from urllib.error import URLError
+from urllib.parse import urljoin
+from urllib.request import urlopen
+import page_archive
+
+CACHED_PASS = "cached pass"
+
+_SCRIPT_SRC = re.compile(rb"<script[^>]*\bsrc=[\"']([^\"']+)[\"']", re.I)
+SITE_TYPES = ("html", "javascript")
+
+
+def _fetch(url, timeout=10):
+    with urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+# hash of the page html and every script it loads, from an archive recorded with
+# page_archive.py or from the live site. None when the site cannot be reached
+def site_fingerprint(url, archive=None):
+    digest = hashlib.sha256()
+    if archive:
+        index = page_archive.read_index(archive)
+        with zipfile.ZipFile(archive) as z:
+            for entry_url, entry in sorted(index["entries"].items()):
+                if any(t in entry["mime"] for t in SITE_TYPES):
+                    digest.update(entry_url.encode())
+                    digest.update(z.read(entry["file"]))
+        return digest.hexdigest()[:16]
+    try:
+        page = _fetch(url)
+        digest.update(page)
+        for src in sorted(set(_SCRIPT_SRC.findall(page))):
+            script = urljoin(url, src.decode())
+            if page_archive.is_tracker(script):
+                continue
+            digest.update(script.encode())
+            digest.update(_fetch(script))
+    except (URLError, OSError):
+        return None
+    return digest.hexdigest()[:16]
+
+
+# hash of the test body, which holds its graph, endpoints and algorithm. comments and
+# formatting do not count
+def source_hash(test):
+    method = getattr(test, test._testMethodName)
+    tree = ast.parse(textwrap.dedent(inspect.getsource(method)))
+    return hashlib.sha256(ast.dump(tree).encode()).hexdigest()[:16]
+
+
+# (run, reason) for each test: run is False for a test whose latest result is a pass
+# with the same site and source
+def select(history, tests, site, full=False):
+    decisions = {}
+    for test in tests:
+        name = test.id().split(".")[-1]
+        source = source_hash(test)
+        previous = history.last_result(name)
+        if full:
+            decision = (True, "forced")
+        elif site is None:
+            decision = (True, "site fingerprint unavailable")
+        elif previous is None:
+            decision = (True, "no previous run")
+        elif previous[1] != "pass":
+            decision = (True, f"last run: {previous[1]}")
+        elif previous[3] is None:
+            decision = (True, "last pass not fingerprinted")
+        elif previous[3] != source:
+            decision = (True, "test changed")
+        elif previous[2] != site:
+            decision = (True, "site changed")
+        else:
+            decision = (False, f"{CACHED_PASS} from run {previous[0]}")
+        decisions[test.id()] = (decision[0], decision[1], source)
+    return decisions
+
+
+def skip_cached(tests, decisions):
+    for test in tests:
+        if not decisions[test.id()][0]:
+            reason = decisions[test.id()][1]
+            # skipped before setUp, so no browser is started for it
+            setattr(test, test._testMethodName, unittest.skip(reason)(lambda: None))
+
+
+def format_selection(decisions):
+    counts = {}
+    for run, reason, _ in decisions.values():
+        key = CACHED_PASS if reason.startswith(CACHED_PASS) else reason
+        counts[key] = counts.get(key, 0) + 1
+    ran = sum(run for run, _, _ in decisions.values())
+    summary = ", ".join(f"{k}: {c}" for k, c in sorted(counts.items()))
+    lines = [f"running {ran}/{len(decisions)} tests ({summary})"]
+    for test_id, (run, reason, _) in sorted(decisions.items()):
+        if run:
+            lines.append(f"  run  {test_id.split('.')[-1]}: {reason}")
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+import unittest
+from history import History
+from selection import CACHED_PASS, select, skip_cached, source_hash
+
+
+class Sample(unittest.TestCase):
+    def test_a(self):
+        self.assertEqual(1 + 1, 2)
+
+    def test_c(self):
+        self.assertEqual(1 + 2, 3)
+
+
+class Reformatted(unittest.TestCase):
+    def test_a(self):
+        # a comment
+        self.assertEqual(1+1, 2)
+
+
+# last_result as History has it, from a {name: (run id, outcome, site, source)} dict
+class FakeHistory:
+    def __init__(self, results):
+        self.results = results
+
+    def last_result(self, name):
+        return self.results.get(name)
+
+
+def reason(decisions, test):
+    return decisions[test.id()][:2]
+
+
+class SourceHashTests(unittest.TestCase):
+    def test_ignores_comments_not_code(self):
+        a, b, c = Sample("test_a"), Reformatted("test_a"), Sample("test_c")
+        self.assertEqual(source_hash(a), source_hash(b))
+        self.assertNotEqual(source_hash(a), source_hash(c))
+        self.assertEqual(source_hash(a), source_hash(Sample("test_a")))
+
+
+class SelectTests(unittest.TestCase):
+    def setUp(self):
+        self.test = Sample("test_a")
+        self.source = source_hash(self.test)
+
+    def decide(self, previous, site="site", full=False):
+        history = FakeHistory({"test_a": previous} if previous else {})
+        return reason(select(history, [self.test], site, full), self.test)
+
+    def test_cached(self):
+        decision = self.decide((5, "pass", "site", self.source))
+        self.assertEqual(decision, (False, f"{CACHED_PASS} from run 5"))
+
+    def test_forced(self):
+        previous = (5, "pass", "site", self.source)
+        self.assertEqual(self.decide(previous, full=True), (True, "forced"))
+
+    def test_no_site(self):
+        previous = (5, "pass", "site", self.source)
+        decision = self.decide(previous, site=None)
+        self.assertEqual(decision, (True, "site fingerprint unavailable"))
+
+    def test_no_previous_run(self):
+        self.assertEqual(self.decide(None), (True, "no previous run"))
+
+    def test_last_run_failed(self):
+        self.assertEqual(self.decide((6, "fail", None, None)), (True, "last run: fail"))
+
+    def test_unfingerprinted_pass(self):
+        decision = self.decide((5, "pass", None, None))
+        self.assertEqual(decision, (True, "last pass not fingerprinted"))
+
+    def test_changed_source(self):
+        decision = self.decide((5, "pass", "site", "0" * 16))
+        self.assertEqual(decision, (True, "test changed"))
+
+    def test_changed_site(self):
+        decision = self.decide((5, "pass", "other", self.source))
+        self.assertEqual(decision, (True, "site changed"))
+
+
+class LastResultTests(unittest.TestCase):
+    def setUp(self):
+        self.history = History(":memory:")
+        self.test = Sample("test_a")
+        self.source = source_hash(self.test)
+
+    def add(self, outcome):
+        run_id = self.history.start_run("suite")
+        result_id = self.history.add_result(run_id, "test_a", None, 0, 0, outcome, 1.0)
+        if outcome == "pass":
+            self.history.add_fingerprint(result_id, "site", self.source)
+        return run_id
+
+    def decide(self):
+        return reason(select(self.history, [self.test], "site"), self.test)
+
+    def test_pass_then_fail_reruns(self):
+        self.add("pass")
+        self.add("fail")
+        self.assertEqual(self.decide(), (True, "last run: fail"))
+
+    def test_cached_runs_do_not_hide_the_pass(self):
+        run_id = self.add("pass")
+        self.add("cached")
+        self.add("skip")
+        self.assertEqual(self.decide(), (False, f"{CACHED_PASS} from run {run_id}"))
+
+    def test_fail_then_pass_is_cached(self):
+        self.add("fail")
+        run_id = self.add("pass")
+        self.assertEqual(self.decide(), (False, f"{CACHED_PASS} from run {run_id}"))
+
+
+class SkipCachedTests(unittest.TestCase):
+    def test_only_cached_tests_skip(self):
+        tests = [Sample("test_a"), Sample("test_c")]
+        decisions = {
+            tests[0].id(): (False, f"{CACHED_PASS} from run 5", "x"),
+            tests[1].id(): (True, "test changed", "y"),
+        }
+        skip_cached(tests, decisions)
+        result = unittest.TestResult()
+        unittest.TestSuite(tests).run(result)
+        self.assertEqual(result.testsRun, 2)
+        self.assertEqual(
+            [(t.id(), r) for t, r in result.skipped],
+            [(tests[0].id(), f"{CACHED_PASS} from run 5")],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,735 @@
+import contextlib
+import functools
+import json
+import os
+import shutil
+import time
+import flow_check
+import graph_validator
+import page_archive
+import timeouts
+from command_log import CommandLog, brief
+from selenium import webdriver
+from selenium.common.exceptions import (
+    StaleElementReferenceException,
+    TimeoutException,
+)
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.common.by import By
+from utils import (
+    ALGORITHMS,
+    FAST_TIMEOUT,
+    WAIT,
+    parse_max_flow,
+    poll,
+    register_algorithm,
+)
+
+# the algorithm panels the page offers, as [[id, label], ...]
+DISCOVER_ALGORITHMS_JS = """
+var found = [];
+document.querySelectorAll("[id$='-go']").forEach(function (go) {
+    var id = go.id.slice(0, -3);
+    if (!document.getElementById(id + "-sourcevertex")) return;
+    var button = document.getElementById(id);
+    found.push([id, button ? button.innerText.trim() : id]);
+});
+return found;
+"""
+
+# true once the page has finished its ajax calls and jQuery animations
+PAGE_IDLE_JS = """
+if (document.readyState !== "complete") return false;
+var $ = window.jQuery;
+return !$ || ($.active === 0 && $(":animated").length === 0);
+"""
+
+# sets the source and sink fields in one call, firing the events a user would
+SET_ENDPOINTS_JS = """
+var id = arguments[0];
+[["-sourcevertex", arguments[1]], ["-sinkvertex", arguments[2]]].forEach(function (f) {
+    var el = document.getElementById(id + f[0]);
+    el.value = f[1];
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+});
+"""
+
+# everything needed to decide how a run ended, in one round trip
+RUN_STATE_JS = """
+function text(sel) {
+    var el = document.querySelector(sel);
+    return el && el.getClientRects().length ? el.innerText : null;
+}
+return {
+    error: text("#" + arguments[0] + "-err"),
+    finish: text("#go-to-end") !== null,
+    status: text("#status"),
+};
+"""
+
+# brackets each algorithm's go handler with performance marks. the capture listener on
+# document fires before the page's handler and the listener on the button after it, so
+# the measure covers the synchronous computation behind the click
+TIMING_HOOK_JS = """
+var ids = arguments[0];
+ids.forEach(function (id) {
+    var go = document.getElementById(id + "-go");
+    if (!go || go.dataset.perfHook) return;
+    go.dataset.perfHook = "1";
+    document.addEventListener("click", function (e) {
+        if (go.contains(e.target)) performance.mark(id + "-start");
+    }, true);
+    go.addEventListener("click", function () {
+        if (performance.getEntriesByName(id + "-start", "mark").length) {
+            performance.measure(id, id + "-start");
+            performance.clearMarks(id + "-start");
+        }
+    });
+});
+"""
+
+# records the text of every #status update from now on, also when it repeats the
+# previous message. the mutations of one update (emptying and refilling the element)
+# arrive in a single observer callback, so each update is logged once
+STATUS_LOG_JS = """
+var status = document.getElementById("status");
+window.statusLog = [];
+if (!status) return false;
+if (window.statusObserver) window.statusObserver.disconnect();
+window.statusObserver = new MutationObserver(function () {
+    var text = status.innerText;
+    if (text) window.statusLog.push(text);
+});
+window.statusObserver.observe(
+    status, {childList: true, characterData: true, subtree: true}
+);
+return true;
+"""
+
+STATUS_LOG_READ_JS = """
+var log = window.statusLog || [];
+window.statusLog = [];
+return log;
+"""
+
+# upper bound for playing a run through to its end
+PLAY_WAIT = 120
+
+# text of the first element matching a css selector, or null if it is missing or not
+# rendered. one round trip and never raises, unlike find_element
+VISIBLE_TEXT_JS = """
+var el = document.querySelector(arguments[0]);
+if (!el || !el.getClientRects().length) return null;
+return el.innerText;
+"""
+
+SUBMIT_GRAPH = "//button[contains(@onclick, 'create_graph(true)')]"
+
+# strips the visualisation's animation work: css transitions, jQuery effects and d3
+# transition durations go to zero and the speed slider to its maximum. returns the
+# measures that found something to act on
+NO_ANIMATION_JS = """
+var applied = [];
+if (!document.getElementById("no-animation")) {
+    var style = document.createElement("style");
+    style.id = "no-animation";
+    style.textContent = "*, *::before, *::after " +
+        "{ transition: none !important; animation: none !important; }";
+    document.head.appendChild(style);
+}
+applied.push("css");
+var $ = window.jQuery;
+if ($) {
+    $.fx.off = true;
+    applied.push("jquery");
+    var speed = $("#speed-input");
+    if (speed.length && speed.slider) {
+        try {
+            speed.slider("value", speed.slider("option", "max"));
+            applied.push("speed");
+        } catch (e) {}
+    }
+}
+var d3 = window.d3;
+if (d3 && d3.transition && d3.transition.prototype.duration) {
+    var proto = d3.transition.prototype;
+    if (!proto.duration.instant) {
+        ["duration", "delay"].forEach(function (name) {
+            var original = proto[name];
+            proto[name] = function () {
+                return arguments.length ? original.call(this, 0) : original.call(this);
+            };
+            proto[name].instant = true;
+        });
+    }
+    applied.push("d3");
+}
+return applied;
+"""
+
+# [id, text] of every svg text element, with the id of its parent when it has none.
+# flow_check.parse_flow_labels picks the edge labels out of them
+FLOW_LABELS_JS = """
+var texts = [];
+document.querySelectorAll("svg text").forEach(function (el) {
+    var id = el.id || (el.parentNode && el.parentNode.id) || "";
+    texts.push([id, el.textContent]);
+});
+return texts;
+"""
+
+# Chrome DevTools Performance.getMetrics values sampled after each run
+HEAP_METRICS = ["JSHeapUsedSize", "Nodes", "JSEventListeners", "LayoutCount"]
+
+TIMING_READ_JS = """
+var entries = performance.getEntriesByName(arguments[0], "measure");
+if (!entries.length) return null;
+var duration = entries[entries.length - 1].duration;
+performance.clearMeasures(arguments[0]);
+return duration;
+"""
+
+
+# two idle polls in a row, so a handler that starts an animation late is caught
+def idle_check(driver):
+    streak = [0]
+
+    def settled():
+        streak[0] = streak[0] + 1 if driver.execute_script(PAGE_IDLE_JS) else 0
+        return streak[0] >= 2
+
+    return settled
+
+
+# raises TimeoutException naming step if the page is still busy after timeout
+def wait_idle(driver, timeout=WAIT, step="page load"):
+    if not poll(idle_check(driver), timeout):
+        raise TimeoutException(f"page still busy {timeout}s after {step}")
+    return True
+
+
+# click and wait for page load
+def cw(elem):
+    elem.click()
+    wait_idle(elem.parent)
+
+
+# records how long a SiteManager method took in self.step_times
+def timed_step(name):
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.step(name):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class SiteManager:
+    # with collect_metrics, heap metrics are sampled after every run and the page is
+    # reloaded before the next one once a metric has grown past its limit in
+    # recycle_thresholds, e.g. {"JSHeapUsedSize": 50e6}
+    #
+    # with replay, the page is served from an archive recorded by page_archive.py and
+    # nothing else is fetched; replay_version pins the archive to one site version
+    #
+    # waits time out after a high quantile of their past latencies for the step and
+    # graph size; latency_path keeps those latencies between runs
+    #
+    # with remote, the browser comes from a WebDriver endpoint such as driver_pool.py
+    # instead of a chromedriver started for this SiteManager
+    #
+    # the last command_log driver commands are kept for dump_failure
+    def __init__(
+        self,
+        url,
+        collect_metrics=False,
+        recycle_thresholds=None,
+        replay=None,
+        replay_version=None,
+        latency_path=None,
+        remote=None,
+        command_log=100,
+    ):
+        self.replay_server = None
+        if replay:
+            self.replay_server = page_archive.ReplayServer(replay, replay_version)
+            url = self.replay_server.start().local_url(url)
+        self.url = url
+        self.remote = remote
+        options = webdriver.ChromeOptions()
+        # keeps the console for dump_failure
+        options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+        if remote:
+            executor = ChromiumRemoteConnection(remote, "goog", "chrome", True)
+            self.driver = webdriver.Remote(executor, options=options)
+        else:
+            self.driver = webdriver.Chrome(options=options)
+        self.commands = CommandLog(self.driver.execute, command_log)
+        self.driver.execute = self.commands
+        if self.replay_server:
+            self.cdp("Network.enable")
+            self.cdp("Network.setBlockedURLs", {"urls": page_archive.REPLAY_BLOCKED})
+        self.collect_metrics = collect_metrics
+        self.recycle_thresholds = recycle_thresholds or {}
+        self.metric_samples = []
+        self.metric_baseline = {}
+        self.recycle_pending = False
+        self.recycles = 0
+        self.timing = False
+        self.fast = False
+        self.graph_str = ""
+        self.step_times = []
+        self.latency = timeouts.LatencyStats(latency_path)
+        # steps whose wait only succeeded on the retry
+        self.retries = []
+        # element handles resolved on the current page load, keyed by locator
+        self.elements = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_stale = 0
+        self.load()
+        # the registry also picks up panels the site added since ALGORITHMS was written
+        self.discover_algorithms()
+
+    def load(self):
+        self.driver.get(self.url)
+        self.elements.clear()
+        if self.fast:
+            self.driver.execute_script(NO_ANIMATION_JS)
+        if self.collect_metrics:
+            self.cdp("Performance.enable")
+            self.metric_baseline = self.get_metrics()
+
+    # fresh page load, set up the same way as the one it replaces
+    def recycle(self):
+        self.load()
+        self.close_instructions()
+        if self.timing:
+            self.enable_timing()
+        self.recycle_pending = False
+        self.recycles += 1
+
+    @contextlib.contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.step_times.append((name, time.perf_counter() - start))
+
+    # registers the site's algorithm panels the registry does not know about yet
+    def discover_algorithms(self):
+        found = self.driver.execute_script(DISCOVER_ALGORITHMS_JS)
+        return [register_algorithm(algorithm_id, name) for algorithm_id, name in found]
+
+    def element(self, by, value):
+        elem = self.elements.get((by, value))
+        if elem is None:
+            self.cache_misses += 1
+            elem = self.elements[(by, value)] = self.driver.find_element(by, value)
+        else:
+            self.cache_hits += 1
+        return elem
+
+    # runs action on the cached element, re-resolving it once if it has gone stale
+    def with_element(self, by, value, action):
+        try:
+            return action(self.element(by, value))
+        except StaleElementReferenceException:
+            self.cache_stale += 1
+            self.elements.pop((by, value), None)
+            return action(self.element(by, value))
+
+    # polls fn with the learned timeout of step, then once more for at most as long
+    # again, never past default. a wait that only succeeds on the retry is counted in
+    # self.retries. a wait that fails both still records the time it waited, so a step
+    # that got slower widens its timeout instead of failing every time
+    def wait(self, step, fn, default=WAIT):
+        n = self.graph_size()[0]
+        timeout = self.latency.timeout(step, n, default)
+        start = time.monotonic()
+        value = poll(fn, timeout)
+        learned = timeout < default
+        if not value and learned:
+            value = poll(fn, min(default - timeout, timeout))
+            if value:
+                self.retries.append(step)
+        if value or learned:
+            self.latency.record(step, n, time.monotonic() - start)
+        return value
+
+    def click(self, by, value):
+        self.with_element(by, value, lambda elem: elem.click())
+        step = f"click {value}"
+        if not self.wait(step, idle_check(self.driver)):
+            raise TimeoutException(f"page still busy after {step}")
+
+    def fill(self, by, value, text):
+        def action(elem):
+            elem.clear()
+            elem.send_keys(text)
+
+        self.with_element(by, value, action)
+
+    def text(self, by, value):
+        return self.with_element(by, value, lambda elem: elem.text)
+
+    def cache_stats(self):
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "stale": self.cache_stale,
+            "cached": len(self.elements),
+        }
+
+    # a devtools command, on local and remote sessions alike
+    def cdp(self, cmd, params=None):
+        params = {"cmd": cmd, "params": params or {}}
+        return self.driver.execute("executeCdpCommand", params)["value"]
+
+    def get_metrics(self):
+        metrics = self.cdp("Performance.getMetrics")["metrics"]
+        return {m["name"]: m["value"] for m in metrics if m["name"] in HEAP_METRICS}
+
+    def browser_version(self):
+        return self.driver.capabilities.get("browserVersion", "")
+
+    def graph_size(self):
+        try:
+            n, m = self.graph_str.split("\n", 1)[0].split()[:2]
+            return int(n), int(m)
+        except ValueError:
+            return None, None
+
+    def _after_run(self, algorithm, max_flow):
+        if not self.collect_metrics:
+            return
+        metrics = self.get_metrics()
+        growth = {k: v - self.metric_baseline.get(k, 0) for k, v in metrics.items()}
+        limits = self.recycle_thresholds
+        exceeded = [k for k, limit in limits.items() if growth.get(k, 0) > limit]
+        n, m = self.graph_size()
+        self.metric_samples.append(
+            {
+                "algorithm": algorithm,
+                "n": n,
+                "m": m,
+                "max_flow": max_flow,
+                "metrics": metrics,
+                "growth": growth,
+                "exceeded": exceeded,
+            }
+        )
+        # recycle lazily so the caller can still inspect the page after this run
+        if exceeded:
+            self.recycle_pending = True
+
+    # animation-free mode for the rest of this session; turning it off reloads the page
+    def set_fast_mode(self, enabled=True):
+        if enabled:
+            self.fast = True
+            return self.driver.execute_script(NO_ANIMATION_JS)
+        if self.fast:
+            self.fast = False
+            self.recycle()
+        return []
+
+    # runs the graph with normal playback and then in fast mode, and checks that
+    # #status ends up the same. returns both status texts
+    def verify_fast_mode(self, algorithm, graph_str, s, t, default_graph=False):
+        fast = self.fast
+        statuses = []
+        for enabled in (False, True):
+            self.set_fast_mode(enabled)
+            self.run(algorithm, graph_str, s, t, default_graph)
+            statuses.append(self.visible_text("#status"))
+        self.set_fast_mode(fast)
+        if statuses[0] != statuses[1]:
+            raise AssertionError(
+                f"fast mode changed {algorithm} status from {statuses[0]!r} "
+                f"to {statuses[1]!r}"
+            )
+        return statuses
+
+    # browser-side timing of the algorithm handlers, independent of cw sleeps
+    def enable_timing(self):
+        self.driver.execute_script(TIMING_HOOK_JS, list(ALGORITHMS))
+        self.timing = True
+
+    # milliseconds spent in the last run of algorithm, or None if it did not run
+    def algorithm_time(self, algorithm):
+        return self.driver.execute_script(TIMING_READ_JS, algorithm)
+
+    def close_instructions(self):
+        self.driver.execute_script("end_eLecture();")
+
+    @timed_step("open_graph_input")
+    def open_graph_input(self, default=False):
+        if self.recycle_pending:
+            self.recycle()
+        self.click(By.ID, "draw")
+        self.click(By.ID, "graph-input")
+        # set to 0-indexed
+        zero_index = "//input[@value='0-Index']"
+        self.with_element(By.XPATH, zero_index, lambda elem: elem.click())
+        # set the type to flow
+        if not default:
+            self.click(By.XPATH, "//input[@value='Flow']")
+
+    # assumes graph input field is already open
+    @timed_step("set_graph")
+    def set_graph(self, graph_str, click_done=True):
+        # set the text in the graph input field
+        self.fill(By.ID, "graph-input-field", graph_str)
+        self.graph_str = graph_str
+        # submit this graph
+        self.click(By.XPATH, SUBMIT_GRAPH)
+        if click_done:
+            self.click(By.CLASS_NAME, "done-button")
+
+    def get_input_error(self):
+        err = self.driver.find_element(By.ID, "error_messages_graph_input")
+        return err.find_element(By.TAG_NAME, "p").text
+
+    def get_draw_error(self):
+        editor = self.driver.find_element(By.ID, "main")
+        err = editor.find_element(By.ID, "draw-err")
+        return err.find_element(By.TAG_NAME, "p").text
+
+    # runs a registered algorithm on the graph that is already drawn. returns the max
+    # flow, or -1 if the site shows an error instead of running it
+    def run_algorithm(self, algorithm, s, t):
+        with self.step(algorithm):
+            max_flow = self._run_algorithm(ALGORITHMS[algorithm].id, s, t)
+        self._after_run(algorithm, max_flow)
+        return max_flow
+
+    def _run_algorithm(self, algorithm, s, t):
+        self.click(By.ID, algorithm)
+        self.driver.execute_script(SET_ENDPOINTS_JS, algorithm, str(s), str(t))
+        self.click(By.ID, f"{algorithm}-go")
+        state = self.wait(
+            f"{algorithm} finish", lambda: self._run_state(algorithm, "error", "finish")
+        )
+        if state is None or state["error"]:
+            return -1
+        self.click(By.ID, "go-to-end")
+        state = self.wait(
+            f"{algorithm} result", lambda: self._run_state(algorithm, "error", "result")
+        )
+        if state is None or state["result"] is None:
+            return -1
+        return state["result"]
+
+    # the run state if any of the given keys is set in it, else None
+    def _run_state(self, algorithm, *keys):
+        state = self.driver.execute_script(RUN_STATE_JS, algorithm)
+        try:
+            state["result"] = parse_max_flow(state["status"] or "")
+        except ValueError:
+            state["result"] = None
+        # a max flow of 0 is a result, so each key is tested on its own terms
+        is_set = {
+            "result": state["result"] is not None,
+            "error": bool(state["error"]),
+            "finish": state["finish"] is True,
+        }
+        return state if any(is_set[k] for k in keys) else None
+
+    def run(self, algorithm, graph_str, s, t, default_graph=False):
+        self.open_graph_input(default_graph)
+        self.set_graph(graph_str)
+        return self.run_algorithm(algorithm, s, t)
+
+    # draws the graph once and then runs algorithm for every (s, t) in pairs, changing
+    # only the source and sink fields in between. yields (s, t, max flow or -1)
+    def sweep_pairs(self, algorithm, graph_str, pairs, default_graph=False):
+        self.open_graph_input(default_graph)
+        self.set_graph(graph_str)
+        for s, t in pairs:
+            yield s, t, self.run_algorithm(algorithm, s, t)
+
+    # plays a run through without skipping to the end and counts the #status messages
+    # matching each of patterns, {quantity: regex}. None if the run did not finish
+    def count_operations(self, algorithm, graph_str, s, t, patterns=None):
+        import op_counts
+
+        if patterns is None:
+            patterns = op_counts.OPERATION_PATTERNS.get(algorithm, {})
+        self.open_graph_input()
+        self.set_graph(graph_str)
+        self.driver.execute_script(STATUS_LOG_JS)
+        self.click(By.ID, algorithm)
+        self.driver.execute_script(SET_ENDPOINTS_JS, algorithm, str(s), str(t))
+        self.click(By.ID, f"{algorithm}-go")
+
+        def finished():
+            state = self._run_state(algorithm, "error", "result")
+            if state and (state["error"] or "max flow" in state["status"].lower()):
+                return state
+            return None
+
+        state = self.wait(f"{algorithm} play", finished, PLAY_WAIT)
+        statuses = self.driver.execute_script(STATUS_LOG_READ_JS)
+        if state is None or state["error"]:
+            return None
+        return op_counts.count_matches(statuses, patterns)
+
+    def get_algorithm_error(self, algorithm):
+        return self.text(By.ID, f"{algorithm}-err")
+
+    def ford_fulkerson(self, s, t):
+        return self.run_algorithm("fordfulkerson", s, t)
+
+    def run_ford_fulkerson(self, graph_str, s, t, default_graph=False):
+        return self.run("fordfulkerson", graph_str, s, t, default_graph)
+
+    def get_ford_fulkerson_error(self):
+        return self.get_algorithm_error("fordfulkerson")
+
+    def edmonds_karp(self, s, t):
+        return self.run_algorithm("edmondskarp", s, t)
+
+    def run_edmonds_karp(self, graph_str, s, t, default_graph=False):
+        return self.run("edmondskarp", graph_str, s, t, default_graph)
+
+    def get_edmonds_karp_error(self):
+        return self.get_algorithm_error("edmondskarp")
+
+    def dinics(self, s, t):
+        return self.run_algorithm("dinic", s, t)
+
+    def run_dinics(self, graph_str, s, t, default_graph=False):
+        return self.run("dinic", graph_str, s, t, default_graph)
+
+    def get_dinics_error(self):
+        return self.get_algorithm_error("dinic")
+
+    # the final flow on each edge of the drawn graph, in the order of the graph input
+    def edge_flows(self, graph_str=None):
+        _, edges = graph_validator.parse(graph_str or self.graph_str)
+        texts = self.driver.execute_script(FLOW_LABELS_JS)
+        try:
+            return flow_check.label_flows(edges, flow_check.parse_flow_labels(texts))
+        except flow_check.FlowLabelError as e:
+            raise AssertionError(str(e))
+
+    # checks the drawn flow assignment, not just its value
+    def expect_valid_flow(self, s, t, max_flow=None):
+        n, edges = graph_validator.parse(self.graph_str)
+        report = flow_check.check_flow(n, edges, self.edge_flows(), s, t, max_flow)
+        if report.problems:
+            raise AssertionError("invalid flow: " + "; ".join(report.problems))
+        return report
+
+    def visible_text(self, selector):
+        return self.driver.execute_script(VISIBLE_TEXT_JS, selector)
+
+    def expect_input_error(self, expected, timeout=FAST_TIMEOUT):
+        selector = "#error_messages_graph_input p"
+        text = self.wait("input error", lambda: self.visible_text(selector), timeout)
+        if not text or expected not in text:
+            raise AssertionError(f"expected input error {expected!r}, got {text!r}")
+        return text
+
+    def expect_draw_error(self, expected, timeout=FAST_TIMEOUT):
+        selector = "#main #draw-err p"
+        text = self.wait("draw error", lambda: self.visible_text(selector), timeout)
+        if not text or expected not in text:
+            raise AssertionError(f"expected draw error {expected!r}, got {text!r}")
+        return text
+
+    # passes if starting the algorithm shows an error in #<algorithm>-err (containing
+    # expected, if given) instead of running it. while the graph input or the draw
+    # editor is still open with an error in it the panel is unreachable, which also
+    # counts as blocked; any other missing panel fails, as does a page that neither
+    # errors nor runs within timeout. the page reacts to the click synchronously, so
+    # the wait is short
+    def expect_algorithm_blocked(
+        self, algorithm, s, t, expected=None, timeout=FAST_TIMEOUT
+    ):
+        if self.visible_text(f"#{algorithm}") is None:
+
+            def graph_error():
+                input_error = self.visible_text("#error_messages_graph_input p")
+                return input_error or self.visible_text("#main #draw-err p")
+
+            error = self.wait("graph error", graph_error, timeout)
+            if expected is None and error:
+                return error
+            raise AssertionError(
+                f"{algorithm} panel is not on the page, expected it to be blocked"
+            )
+        self.with_element(By.ID, algorithm, lambda elem: elem.click())
+        self.driver.execute_script(SET_ENDPOINTS_JS, algorithm, str(s), str(t))
+        status = self.visible_text("#status")
+        self.with_element(By.ID, f"{algorithm}-go", lambda elem: elem.click())
+
+        def outcome():
+            state = self.driver.execute_script(RUN_STATE_JS, algorithm)
+            if state["error"]:
+                return "error", state["error"]
+            if state["finish"] or (state["status"] and state["status"] != status):
+                return "ran", state["status"]
+            return None
+
+        state = self.wait(f"{algorithm} blocked", outcome, timeout)
+        if state is None:
+            raise AssertionError(
+                f"{algorithm} neither showed an error nor ran within {timeout}s"
+            )
+        kind, text = state
+        if kind == "ran":
+            raise AssertionError(f"{algorithm} ran from {s} to {t}: {text!r}")
+        if expected is not None and expected not in text:
+            raise AssertionError(
+                f"expected {algorithm} error {expected!r}, got {text!r}"
+            )
+        return text
+
+    # writes the recent driver commands, one dom snapshot, the browser console and the
+    # graph text to directory, replacing what an earlier failure left there. the page
+    # may be broken already, so reading it never raises; writing can raise OSError
+    def dump_failure(self, directory, error=None):
+        commands = self.commands.dump()
+        try:
+            dom = self.driver.execute_script(
+                "return document.documentElement.outerHTML"
+            )
+        except Exception as e:
+            dom = f"<!-- no dom snapshot: {brief(str(e))} -->"
+        try:
+            console = self.driver.execute("getLog", {"type": "browser"})["value"]
+        except Exception as e:
+            console = [{"error": brief(str(e))}]
+        failure = {
+            "error": error,
+            "url": self.url,
+            "steps": self.step_times,
+            "retries": self.retries,
+            "commands": commands,
+        }
+        files = {
+            "failure.json": json.dumps(failure, indent=1, default=repr),
+            "dom.html": dom or "",
+            "console.json": json.dumps(console, indent=1, default=repr),
+            "graph.txt": self.graph_str,
+        }
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        for name, text in files.items():
+            with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+                f.write(text)
+        return directory
+
+    def __del__(self):
+        # a pooled session keeps its window for the next user
+        if not self.remote:
+            self.driver.close()
+        self.driver.quit()
+        if self.replay_server:
+            self.replay_server.stop()
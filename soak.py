@@ -0,0 +1,297 @@
+import argparse
+import collections
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from graph import Graph
+from graph_gen import FAMILIES, generate
+from graph_hash import Dedup, distinct
+from history import History
+from live_report import Dashboard, Reporter, record
+from utils import add_site_args, site_from_args
+
+
+def graph_stream(families, min_n, max_n, seed=0):
+    rng = random.Random(seed)
+    for i in itertools.count():
+        yield generate(rng.choice(families), rng.randint(min_n, max_n), seed + i)
+
+
+DEDUP = {"exact": Dedup, "structural": lambda: Dedup(structural=True)}
+# duplicates in a row after which a generated stream counts as exhausted
+GIVE_UP = 1000
+
+
+def corpus_stream(path):
+    corpus = Graph.open_corpus(path)
+    while len(corpus):
+        yield from corpus
+
+
+# one record per graph: position is the number of graphs run since the last recycle.
+# reporter, a live_report.Reporter, gets each graph as soon as it has run, and graphs
+# that fail leave their SiteManager.dump_failure artifacts under artifacts
+def soak(
+    site_manager,
+    graphs,
+    algorithms,
+    count,
+    hours,
+    recycle_every,
+    window,
+    log,
+    reporter=None,
+    artifacts=None,
+):
+    records = []
+    recycle_times = []
+    position = 0
+    deadline = time.monotonic() + hours * 3600 if hours else None
+    for i, graph in enumerate(graphs):
+        if count is not None and i >= count:
+            break
+        if deadline and time.monotonic() > deadline:
+            break
+        if recycle_every and position == recycle_every:
+            start = time.monotonic()
+            site_manager.recycle()
+            recycle_times.append(time.monotonic() - start)
+            position = 0
+        algorithm = algorithms[i % len(algorithms)]
+        error = None
+        samples = len(site_manager.metric_samples)
+        mark = len(site_manager.step_times)
+        retry_mark = len(site_manager.retries)
+        start = time.monotonic()
+        try:
+            max_flow = site_manager.run(algorithm, str(graph), 0, graph.n - 1)
+            if max_flow < 0:
+                error = "no result"
+        except Exception as e:
+            error = type(e).__name__
+        latency = time.monotonic() - start
+        fresh = len(site_manager.metric_samples) > samples
+        sample = site_manager.metric_samples[-1] if fresh else {}
+        records.append(
+            {
+                "index": i,
+                "position": position,
+                "algorithm": algorithm,
+                "n": graph.n,
+                "m": len(graph.edges),
+                "latency": latency,
+                "error": error,
+                "heap": sample.get("metrics", {}).get("JSHeapUsedSize"),
+                "metrics": sample.get("metrics", {}),
+                "steps": site_manager.step_times[mark:],
+                "retries": site_manager.retries[retry_mark:],
+            }
+        )
+        if reporter:
+            steps = site_manager.step_times[mark:]
+            outcome = "error" if error else "pass"
+            name = f"{algorithm}/{graph.n}/{i}"
+            m = len(graph.edges)
+            r = record(name, algorithm, graph.n, m, outcome, latency, steps, error)
+            reporter.add(r)
+        position += 1
+        if error and artifacts:
+            directory = os.path.join(artifacts, f"graph-{i}")
+            message = f"{algorithm} on {graph.n}: {error}"
+            try:
+                site_manager.dump_failure(directory, message)
+            except OSError as e:
+                log(f"graph {i}: no artifacts, {e}")
+        if error:
+            # a broken page would fail every following graph, start over
+            start = time.monotonic()
+            site_manager.recycle()
+            recycle_times.append(time.monotonic() - start)
+            position = 0
+        if (i + 1) % window == 0:
+            log(window_line(records[-window:]))
+    # the recycle period report needs the cost of one
+    if records and not recycle_times:
+        start = time.monotonic()
+        site_manager.recycle()
+        recycle_times.append(time.monotonic() - start)
+    return records, recycle_times
+
+
+def window_line(records):
+    latencies = [r["latency"] for r in records]
+    errors = sum(1 for r in records if r["error"])
+    heaps = [r["heap"] for r in records if r["heap"] is not None]
+    heap = f", heap {heaps[-1] / 1e6:.1f} MB" if heaps else ""
+    return (
+        f"graphs {records[0]['index']}-{records[-1]['index']}: "
+        f"median {statistics.median(latencies):.2f}s, "
+        f"errors {errors}/{len(records)}{heap}"
+    )
+
+
+# latency drift as a linear fit of latency against position in the session
+def drift(records):
+    points = [(r["position"], r["latency"]) for r in records if not r["error"]]
+    if len({p for p, _ in points}) < 2:
+        return statistics.fmean(l for _, l in points) if points else 0.0, 0.0
+    slope, intercept = statistics.linear_regression(*zip(*points))
+    return intercept, slope
+
+
+# sustained throughput of recycling every k graphs is k / (k runs + one recycle), which
+# with latency a + b * position peaks near sqrt(2 * recycle / b). (None, None) when no
+# recycle was timed
+def best_recycle_period(records, recycle_times, max_period):
+    if not recycle_times:
+        return None, None
+    a, b = drift(records)
+    recycle = statistics.fmean(recycle_times)
+
+    def throughput(k):
+        return k / (k * a + b * k * (k - 1) / 2 + recycle)
+
+    if b <= 0:
+        return None, throughput(max_period)
+    k = max(range(1, max_period + 1), key=throughput)
+    return k, throughput(k)
+
+
+def report(records, recycle_times):
+    lines = []
+    latencies = [r["latency"] for r in records]
+    errors = [r for r in records if r["error"]]
+    lines.append(f"graphs run: {len(records)}, errors: {len(errors)}")
+    if latencies:
+        lines.append(
+            f"latency median {statistics.median(latencies):.2f}s, "
+            f"max {max(latencies):.2f}s"
+        )
+    a, b = drift(records)
+    lines.append(f"latency drift: {a:.3f}s + {b * 1000:.3f}ms per graph in session")
+    heaps = [r["heap"] for r in records if r["heap"] is not None]
+    if heaps:
+        first, last = heaps[0] / 1e6, heaps[-1] / 1e6
+        lines.append(f"heap: first {first:.1f} MB, last {last:.1f} MB")
+    if recycle_times:
+        lines.append(
+            f"recycles: {len(recycle_times)}, "
+            f"mean {statistics.fmean(recycle_times):.2f}s"
+        )
+    retried = collections.Counter(step for r in records for step in r["retries"])
+    if retried:
+        steps = ", ".join(f"{step} x{c}" for step, c in retried.most_common(5))
+        lines.append(f"retried waits: {steps}")
+    max_position = max((r["position"] for r in records), default=0) + 1
+    k, rate = best_recycle_period(records, recycle_times, max_position)
+    if rate is None:
+        lines.append("recycle cost unknown, no recycle period suggested")
+    elif k is None:
+        lines.append(f"no drift observed, never recycle ({rate * 60:.1f} graphs/min)")
+    else:
+        lines.append(f"best recycle period: {k} graphs ({rate * 60:.1f} graphs/min)")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="push a long stream of graphs through one browser session"
+    )
+    add_site_args(parser)
+    parser.add_argument("--families", nargs="+", default=["sparse"], choices=FAMILIES)
+    parser.add_argument("--min-n", type=int, default=4)
+    parser.add_argument("--max-n", type=int, default=12)
+    parser.add_argument("--corpus", help="binary graph corpus to cycle through")
+    parser.add_argument(
+        "--graphs", type=int, help="graphs to run, default 1000 unless --hours is set"
+    )
+    parser.add_argument("--hours", type=float, default=0)
+    parser.add_argument(
+        "--recycle-every", type=int, default=0, help="graphs per session, 0 for never"
+    )
+    parser.add_argument("--window", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--dedup",
+        choices=DEDUP,
+        help="skip graphs seen before, up to edge order or also up to relabelling",
+    )
+    parser.add_argument("--json", help="write the per-graph records here")
+    parser.add_argument("--stream", help="append a json line per graph to this file")
+    parser.add_argument("--junit", help="junit xml file, rewritten after every graph")
+    parser.add_argument("--dashboard", action="store_true", help="live progress")
+    parser.add_argument(
+        "--artifacts", help="dump the commands, dom and console of failed graphs here"
+    )
+    parser.add_argument("--history", help="store the records in this database")
+    args = parser.parse_args()
+    # stdout has the progress log and the report
+    if args.stream == "-":
+        parser.error("--stream needs a file, stdout has the soak log")
+
+    give_up = GIVE_UP
+    if args.corpus:
+        graphs = corpus_stream(args.corpus)
+        # a whole cycle of duplicates means every graph in the corpus has run
+        give_up = len(Graph.open_corpus(args.corpus))
+    else:
+        graphs = graph_stream(args.families, args.min_n, args.max_n, args.seed)
+    dedup = DEDUP[args.dedup]() if args.dedup else None
+    if dedup:
+        graphs = distinct(graphs, dedup, max(give_up, 1))
+    count = args.graphs
+    if count is None and not args.hours:
+        count = 1000
+    site_manager = site_from_args(args, collect_metrics=True)
+    reporter = None
+    if args.stream or args.junit or args.dashboard:
+        dashboard = Dashboard(sys.stdout) if args.dashboard else None
+        reporter = Reporter(args.stream, args.junit, dashboard)
+    # the window lines go above the dashboard instead of under its redraws
+    log = reporter.dashboard.note if reporter and reporter.dashboard else print
+    records, recycle_times = soak(
+        site_manager,
+        graphs,
+        args.algorithms,
+        count,
+        args.hours,
+        args.recycle_every,
+        args.window,
+        log,
+        reporter,
+        args.artifacts,
+    )
+    if reporter:
+        reporter.close()
+    print(report(records, recycle_times))
+    if dedup:
+        print(f"{dedup.dropped} duplicate graphs skipped")
+    if args.history:
+        history = History(args.history)
+        run_id = history.start_run("soak", site_manager.browser_version())
+        for r in records:
+            outcome = "error" if r["error"] else "pass"
+            name = f"{r['algorithm']}/{r['n']}"
+            history.add_result(
+                run_id,
+                name,
+                r["algorithm"],
+                r["n"],
+                r["m"],
+                outcome,
+                r["latency"],
+                r["steps"],
+                r["retries"],
+                r["metrics"],
+            )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"records": records, "recycle_times": recycle_times}, f)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import unittest
+from graph_gen import generate
+from soak import best_recycle_period, drift, report, soak
+
+
+# latency a + b * position, over sessions of the given length
+def records(a, b, sessions=3, length=100):
+    return [
+        {
+            "index": i,
+            "position": i % length,
+            "algorithm": "dinic",
+            "latency": a + b * (i % length),
+            "error": None,
+            "heap": None,
+            "retries": [],
+        }
+        for i in range(sessions * length)
+    ]
+
+
+class DriftTests(unittest.TestCase):
+    def test_linear(self):
+        a, b = drift(records(1.0, 0.001))
+        self.assertAlmostEqual(a, 1.0)
+        self.assertAlmostEqual(b, 0.001)
+
+    def test_errors_left_out(self):
+        rs = records(1.0, 0.001)
+        rs[5]["latency"], rs[5]["error"] = 60.0, "TimeoutException"
+        self.assertAlmostEqual(drift(rs)[1], 0.001)
+
+    def test_one_position(self):
+        rs = records(2.0, 0.0, sessions=1, length=1)
+        self.assertEqual(drift(rs), (2.0, 0.0))
+        self.assertEqual(drift([]), (0.0, 0.0))
+
+
+class BestRecyclePeriodTests(unittest.TestCase):
+    def test_unknown_recycle_cost(self):
+        period = best_recycle_period(records(1.0, 0.001), [], 100)
+        self.assertEqual(period, (None, None))
+
+    def test_drift(self):
+        # the optimum is near sqrt(2 * 2 / 0.001), about 63
+        k, rate = best_recycle_period(records(1.0, 0.001), [2.0, 2.0], 100)
+        self.assertIn(k, (63, 64))
+        self.assertAlmostEqual(rate, k / (k + 0.001 * k * (k - 1) / 2 + 2.0))
+
+    def test_capped_at_max_period(self):
+        k, _ = best_recycle_period(records(1.0, 0.0001), [10.0], 20)
+        self.assertEqual(k, 20)
+
+    def test_no_drift(self):
+        k, rate = best_recycle_period(records(1.0, 0.0), [2.0], 100)
+        self.assertIsNone(k)
+        self.assertAlmostEqual(rate, 100 / 102)
+
+
+class ReportTests(unittest.TestCase):
+    def test_recycle_cost_unknown(self):
+        text = report(records(1.0, 0.001), [])
+        self.assertIn("recycle cost unknown, no recycle period suggested", text)
+        self.assertNotIn("best recycle period", text)
+
+    def test_best_period(self):
+        text = report(records(1.0, 0.001), [2.0])
+        self.assertIn("graphs run: 300, errors: 0", text)
+        self.assertIn("latency drift: 1.000s + 1.000ms per graph in session", text)
+        self.assertIn("recycles: 1, mean 2.00s", text)
+        self.assertRegex(text, r"best recycle period: 6[34] graphs")
+
+    def test_no_drift(self):
+        text = report(records(1.0, 0.0), [2.0])
+        self.assertIn("no drift observed, never recycle", text)
+
+
+class FakeSite:
+    def __init__(self):
+        self.metric_samples = []
+        self.step_times = []
+        self.retries = []
+        self.recycles = 0
+
+    def run(self, algorithm, graph_str, s, t):
+        return 1
+
+    def recycle(self):
+        self.recycles += 1
+
+
+class SoakTests(unittest.TestCase):
+    def test_times_one_recycle(self):
+        site = FakeSite()
+        graphs = (generate("sparse", 5, seed) for seed in range(10))
+        rs, recycle_times = soak(site, graphs, ["dinic"], 4, 0, 0, 50, print)
+        self.assertEqual(len(rs), 4)
+        self.assertEqual((site.recycles, len(recycle_times)), (1, 1))
+
+    def test_recycles_every(self):
+        site = FakeSite()
+        graphs = (generate("sparse", 5, seed) for seed in range(10))
+        rs, recycle_times = soak(site, graphs, ["dinic"], 6, 0, 2, 50, print)
+        self.assertEqual([r["position"] for r in rs], [0, 1, 0, 1, 0, 1])
+        self.assertEqual(len(recycle_times), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
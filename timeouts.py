@@ -0,0 +1,106 @@
+import collections
+import contextlib
+import json
+import math
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # no file locking on windows, concurrent saves there can lose samples
+    fcntl = None
+
+# a wait times out at QUANTILE of its recent latencies times FACTOR plus MARGIN
+# seconds. until MIN_SAMPLES latencies are known the caller's default is used
+QUANTILE = 0.99
+FACTOR = 1.5
+MARGIN = 0.2
+MIN_SAMPLES = 20
+# latencies kept per step and size
+KEEP = 200
+
+
+# graphs are grouped by vertex count rounded up to a power of two
+def size_bucket(n):
+    if not n:
+        return 0
+    return 1 << max(0, math.ceil(math.log2(n)))
+
+
+def quantile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)]
+
+
+def _load(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+# serialises savers of path across processes, e.g. parallel scheduler shards
+@contextlib.contextmanager
+def _locked(path):
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+class LatencyStats:
+    # path is a json file the latencies are loaded from and saved to
+    def __init__(self, path=None):
+        self.path = path
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=KEEP))
+        # latencies recorded since the last load or save, merged into the file on save
+        self.fresh = collections.defaultdict(list)
+        for key, values in _load(path).items():
+            self.samples[key].extend(values)
+
+    def _key(self, step, n):
+        return f"{step}|{size_bucket(n)}"
+
+    def record(self, step, n, seconds):
+        key = self._key(step, n)
+        self.samples[key].append(round(seconds, 4))
+        self.fresh[key].append(round(seconds, 4))
+
+    # learned timeout for step on a graph with n vertices, never above default
+    def timeout(self, step, n, default):
+        values = self.samples.get(self._key(step, n))
+        if not values or len(values) < MIN_SAMPLES:
+            return default
+        return min(default, quantile(values, QUANTILE) * FACTOR + MARGIN)
+
+    # adds the fresh latencies to what is in the file now, so processes sharing it
+    # keep each other's samples
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with _locked(path):
+            merged = collections.defaultdict(lambda: collections.deque(maxlen=KEEP))
+            for key, values in _load(path).items():
+                merged[key].extend(values)
+            for key, values in self.fresh.items():
+                merged[key].extend(values)
+            data = {key: list(values) for key, values in merged.items() if values}
+            fd, tmp = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        self.samples = merged
+        self.fresh.clear()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import timeouts
+from timeouts import LatencyStats, quantile, size_bucket
+
+
+class QuantileTests(unittest.TestCase):
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(quantile(values, 0.5), 50)
+        self.assertEqual(quantile(values, 0.99), 99)
+        self.assertEqual(quantile(values, 1.0), 100)
+
+    def test_unordered_and_single(self):
+        self.assertEqual(quantile([3, 1, 2], 0.99), 3)
+        self.assertEqual(quantile([7], 0.01), 7)
+
+    def test_size_bucket(self):
+        buckets = [size_bucket(n) for n in (None, 1, 2, 3, 5, 8)]
+        self.assertEqual(buckets, [0, 1, 2, 4, 8, 8])
+
+
+class TimeoutTests(unittest.TestCase):
+    def test_default_until_enough_samples(self):
+        stats = LatencyStats()
+        for _ in range(timeouts.MIN_SAMPLES - 1):
+            stats.record("click", 4, 0.1)
+        self.assertEqual(stats.timeout("click", 4, 10), 10)
+
+    def test_learned(self):
+        stats = LatencyStats()
+        for _ in range(timeouts.MIN_SAMPLES):
+            stats.record("click", 4, 0.1)
+        expected = 0.1 * timeouts.FACTOR + timeouts.MARGIN
+        self.assertAlmostEqual(stats.timeout("click", 4, 10), expected)
+        # other steps and size buckets keep the default
+        self.assertEqual(stats.timeout("click", 16, 10), 10)
+        self.assertEqual(stats.timeout("finish", 4, 10), 10)
+
+    def test_never_above_default(self):
+        stats = LatencyStats()
+        for _ in range(timeouts.MIN_SAMPLES):
+            stats.record("finish", 4, 20)
+        self.assertEqual(stats.timeout("finish", 4, 10), 10)
+
+
+class SaveTests(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "latencies.json")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_round_trip(self):
+        stats = LatencyStats(self.path)
+        for i in range(timeouts.MIN_SAMPLES):
+            stats.record("click", 4, 0.1 + i / 1000)
+        stats.save()
+        loaded = LatencyStats(self.path)
+        self.assertEqual(list(loaded.samples), list(stats.samples))
+        self.assertEqual(
+            loaded.timeout("click", 4, 10), stats.timeout("click", 4, 10)
+        )
+        leftovers = [f for f in os.listdir(self.dir.name) if f.endswith(".tmp")]
+        self.assertEqual(leftovers, [])
+
+    def test_concurrent_savers_keep_each_others_samples(self):
+        a = LatencyStats(self.path)
+        b = LatencyStats(self.path)
+        a.record("click", 4, 0.1)
+        b.record("click", 4, 0.2)
+        b.record("finish", 4, 1.0)
+        a.save()
+        b.save()
+        # saving again without new samples adds nothing twice
+        a.save()
+        loaded = LatencyStats(self.path)
+        self.assertEqual(sorted(loaded.samples["click|4"]), [0.1, 0.2])
+        self.assertEqual(list(loaded.samples["finish|4"]), [1.0])
+
+    def test_no_path(self):
+        stats = LatencyStats()
+        stats.record("click", 4, 0.1)
+        stats.save()
+        self.assertEqual(os.listdir(self.dir.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()